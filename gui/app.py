@@ -1,6 +1,7 @@
 
 from __future__ import annotations
-import sys, fitz
+import sys
+import pymupdf as fitz  # PyMuPDF
 from PySide6 import QtWidgets, QtGui, QtCore
 from pathlib import Path
 
@@ -60,6 +61,39 @@ class ThumbnailList(QtWidgets.QListWidget):
         if e.button() == QtCore.Qt.LeftButton:
             self.pageActivated.emit(self.currentRow())
 
+class EditJournal:
+    """
+    Undo/redo history of annotation edits. Each entry records how to recreate
+    its annotation, so undo deletes it and redo adds it again in place,
+    without reloading the document. Page numbers are only valid until pages
+    are inserted, deleted or moved; clear() the journal then.
+    """
+    def __init__(self):
+        self._undo = []
+        self._redo = []
+
+    def record(self, entry: dict):
+        self._undo.append(entry)
+        self._redo.clear()
+
+    def pop_undo(self):
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return entry
+
+    def pop_redo(self):
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return entry
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
 class PdfCanvas(QtWidgets.QLabel):
     requestStatus = QtCore.Signal(str)
 
@@ -75,6 +109,8 @@ class PdfCanvas(QtWidgets.QLabel):
         self._drag_start = None
         self._drag_end = None
         self._ink_points = []
+        self._ink_layer = None  # live pen stroke, drawn segment by segment
+        self.journal = EditJournal()
 
     def set_page(self, page: fitz.Page, dpi: int = None):
         if dpi is not None:
@@ -85,6 +121,24 @@ class PdfCanvas(QtWidgets.QLabel):
         self._pix = QtGui.QPixmap.fromImage(img)
         self._update_view()
 
+    def _rerender_clip(self, rect: fitz.Rect):
+        """
+        Re-rasterize only `rect` (unrotated page coordinates) and paint it into
+        the cached page pixmap instead of rendering the whole page again.
+        """
+        if not self._pix or not self._page:
+            return
+        # pad for anti-aliasing and annotation borders spilling over the rect
+        clip = (fitz.Rect(rect) + (-2, -2, 2, 2)) * self._page.rotation_matrix & self._page.rect
+        if clip.is_empty:
+            return
+        pix = self._page.get_pixmap(dpi=self._dpi, clip=clip)
+        img = QtGui.QImage(pix.samples, pix.width, pix.height, pix.stride, QtGui.QImage.Format_RGB888)
+        painter = QtGui.QPainter(self._pix)
+        painter.drawImage(pix.x, pix.y, img)
+        painter.end()
+        self._update_view()
+
     def _update_view(self):
         if not self._pix:
             return
@@ -105,6 +159,8 @@ class PdfCanvas(QtWidgets.QLabel):
             self._drag_end = e.position()
             if self.tool == "pen":
                 self._ink_points = [e.position()]
+                self._ink_layer = QtGui.QPixmap(self.size())
+                self._ink_layer.fill(QtCore.Qt.transparent)
         super().mousePressEvent(e)
 
     def mouseMoveEvent(self, e: QtGui.QMouseEvent) -> None:
@@ -112,9 +168,17 @@ class PdfCanvas(QtWidgets.QLabel):
             return
         if self._dragging:
             self._drag_end = e.position()
-            if self.tool == "pen":
+            if self.tool == "pen" and self._ink_layer is not None:
+                # draw just the new segment and repaint just around it
+                last = self._ink_points[-1]
                 self._ink_points.append(e.position())
-            self.update()
+                painter = QtGui.QPainter(self._ink_layer)
+                painter.setPen(QtGui.QPen(QtCore.Qt.black, 2))
+                painter.drawLine(last, e.position())
+                painter.end()
+                self.update(QtCore.QRectF(last, e.position()).normalized().toAlignedRect().adjusted(-3, -3, 3, 3))
+            else:
+                self.update()
         super().mouseMoveEvent(e)
 
     def mouseReleaseEvent(self, e: QtGui.QMouseEvent) -> None:
@@ -129,24 +193,74 @@ class PdfCanvas(QtWidgets.QLabel):
             elif self.tool == "note":
                 self._apply_note(e.position(), "Note")
             self._ink_points = []
+            self._ink_layer = None
             self._drag_start = self._drag_end = None
             self.update()
         super().mouseReleaseEvent(e)
 
     def paintEvent(self, e):
         super().paintEvent(e)
-        if self._drag_start and self._drag_end and self.tool in ("highlight", "pen"):
+        if self._drag_start and self._drag_end and self.tool == "highlight":
             painter = QtGui.QPainter(self)
-            pen = QtGui.QPen(QtCore.Qt.black, 2, QtCore.Qt.DashLine if self.tool == "highlight" else QtCore.Qt.SolidLine)
-            painter.setPen(pen)
-            if self.tool == "highlight":
-                rect = QtCore.QRectF(self._drag_start, self._drag_end).normalized()
-                painter.drawRect(rect)
-            elif self.tool == "pen" and len(self._ink_points) > 1:
-                for i in range(len(self._ink_points) - 1):
-                    painter.drawLine(self._ink_points[i], self._ink_points[i + 1])
+            painter.setPen(QtGui.QPen(QtCore.Qt.black, 2, QtCore.Qt.DashLine))
+            painter.drawRect(QtCore.QRectF(self._drag_start, self._drag_end).normalized())
+            painter.end()
+        elif self._ink_layer is not None and self.tool == "pen":
+            painter = QtGui.QPainter(self)
+            painter.drawPixmap(e.rect(), self._ink_layer, e.rect())
             painter.end()
 
+    def _add_annot(self, page: fitz.Page, kind: str, args: tuple):
+        if kind == "highlight":
+            return page.add_highlight_annot(fitz.Rect(*args))
+        if kind == "ink":
+            annot = page.add_ink_annot([list(args)])
+            annot.set_border(width=1)
+            annot.update()
+            return annot
+        x, y, text = args
+        return page.add_text_annot(fitz.Point(x, y), text)
+
+    def _journal_page(self, entry: dict) -> fitz.Page:
+        if self._page.number == entry["page"]:
+            return self._page
+        return self._page.parent.load_page(entry["page"])
+
+    def _edit(self, kind: str, args: tuple, status: str):
+        annot = self._add_annot(self._page, kind, args)
+        self.journal.record({"page": self._page.number, "kind": kind, "args": args, "xref": annot.xref})
+        self.requestStatus.emit(status)
+        self._rerender_clip(annot.rect)
+
+    def undo(self):
+        if not self._page:
+            return
+        entry = self.journal.pop_undo()
+        if entry is None:
+            self.requestStatus.emit("Nothing to undo")
+            return
+        page = self._journal_page(entry)
+        annot = page.load_annot(entry["xref"])
+        rect = annot.rect
+        page.delete_annot(annot)
+        self.requestStatus.emit(f"Undid {entry['kind']} on page {entry['page'] + 1}")
+        if page is self._page:
+            self._rerender_clip(rect)
+
+    def redo(self):
+        if not self._page:
+            return
+        entry = self.journal.pop_redo()
+        if entry is None:
+            self.requestStatus.emit("Nothing to redo")
+            return
+        page = self._journal_page(entry)
+        annot = self._add_annot(page, entry["kind"], entry["args"])
+        entry["xref"] = annot.xref
+        self.requestStatus.emit(f"Redid {entry['kind']} on page {entry['page'] + 1}")
+        if page is self._page:
+            self._rerender_clip(annot.rect)
+
     def _apply_rect_highlight(self, p0: QtCore.QPointF, p1: QtCore.QPointF):
         if not self._pix or not self._page:
             return
@@ -156,9 +270,7 @@ class PdfCanvas(QtWidgets.QLabel):
         x1, y1 = pix_to_page_xy(p1_pix, self._dpi)
         rect = fitz.Rect(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
         if rect.width > 0 and rect.height > 0:
-            self._page.add_highlight_annot(rect)
-            self.requestStatus.emit("Added rectangle highlight")
-        self.set_page(self._page, self._dpi)
+            self._edit("highlight", tuple(rect), "Added rectangle highlight")
 
     def _apply_ink(self, points_view):
         if not self._pix or not self._page or len(points_view) < 2:
@@ -168,17 +280,12 @@ class PdfCanvas(QtWidgets.QLabel):
             p = view_to_pix_coords(self, self._pix, pt)
             x, y = pix_to_page_xy(p, self._dpi)
             path.append((x, y))
-        annot = self._page.add_ink_annot([path])
-        annot.set_border(width=1)
-        self.requestStatus.emit("Added ink annotation")
-        self.set_page(self._page, self._dpi)
+        self._edit("ink", tuple(path), "Added ink annotation")
 
     def _apply_note(self, pos_view: QtCore.QPointF, text: str):
         p = view_to_pix_coords(self, self._pix, pos_view)
         x, y = pix_to_page_xy(p, self._dpi)
-        self._page.add_text_annot(fitz.Point(x, y), text)
-        self.requestStatus.emit("Added text note")
-        self.set_page(self._page, self._dpi)
+        self._edit("note", (x, y, text), "Added text note")
 
 class OcrDialog(QtWidgets.QDialog):
     def __init__(self, parent=None):
@@ -248,6 +355,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.act_insert_after = QtGui.QAction("Insert PDF After...", self)
         self.act_compress = QtGui.QAction("Compress...", self)
         self.act_ocr = QtGui.QAction("OCR…", self)
+        self.act_undo = QtGui.QAction("Undo", self)
+        self.act_undo.setShortcut(QtGui.QKeySequence.Undo)
+        self.act_redo = QtGui.QAction("Redo", self)
+        self.act_redo.setShortcut(QtGui.QKeySequence.Redo)
 
         self.find_edit = QtWidgets.QLineEdit()
         self.find_edit.setPlaceholderText("Find text…")
@@ -269,6 +380,9 @@ class MainWindow(QtWidgets.QMainWindow):
                   self.act_delete, self.act_insert_before, self.act_insert_after, self.act_compress, self.act_ocr]:
             tb.addAction(a)
         tb.addSeparator()
+        tb.addAction(self.act_undo)
+        tb.addAction(self.act_redo)
+        tb.addSeparator()
         tb.addWidget(self.find_edit)
         tb.addAction(self.act_find_prev)
         tb.addAction(self.act_find_next)
@@ -293,6 +407,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.act_insert_after.triggered.connect(lambda: self._insert_pdf(where="after"))
         self.act_compress.triggered.connect(self._compress_dialog)
         self.act_ocr.triggered.connect(self._ocr_dialog)
+        self.act_undo.triggered.connect(self.canvas.undo)
+        self.act_redo.triggered.connect(self.canvas.redo)
         self.act_find_prev.triggered.connect(lambda: self._find(step=-1))
         self.act_find_next.triggered.connect(lambda: self._find(step=+1))
         self.find_edit.returnPressed.connect(lambda: self._find(step=+1, reset=True))
@@ -317,6 +433,7 @@ class MainWindow(QtWidgets.QMainWindow):
         path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open PDF", "", "PDF files (*.pdf)")
         if not path: return
         self.doc = fitz.open(path)
+        self.canvas.journal.clear()
         self.page_index = 0
         self.setWindowTitle(f"PDFCraft – {Path(path).name}")
         self._populate_thumbs()
@@ -360,6 +477,7 @@ class MainWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "PDFCraft", "Cannot delete the last page.")
             return
         self.doc.delete_page(self.page_index)
+        self.canvas.journal.clear()  # page numbers shifted
         self.page_index = max(0, self.page_index - 1)
         self._refresh()
 
@@ -367,6 +485,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.doc: return
         if src == dst: return
         self.doc.move_page(src, dst)
+        self.canvas.journal.clear()
         self.page_index = dst
         self._refresh()
 
@@ -377,6 +496,7 @@ class MainWindow(QtWidgets.QMainWindow):
         with fitz.open(other) as src:
             pos = self.page_index + (1 if where == "after" else 0)
             self.doc.insert_pdf(src, start=0, end=src.page_count-1, start_at=pos)
+        self.canvas.journal.clear()
         self._refresh()
 
     def _compress_dialog(self):
@@ -0,0 +1,263 @@
+"""
+Asyncio front end for pdfcraft operations.
+
+Operations are blocking and CPU heavy, so `Runner` executes them on a process
+(default) or thread executor and only awaits the result in the event loop.
+Concurrency is capped per operation type, e.g. a couple of OCR jobs next to
+many `info` calls, and an optional global `max_pending` bound makes callers
+wait (backpressure) instead of queueing unbounded work and memory.
+
+With the process executor, arguments and results cross process boundaries:
+pass paths or bytes and use output=None to get bytes back, not open streams
+(highlight/redact then return (hits, bytes); split and extract_images return
+the files in memory).
+"""
+from __future__ import annotations
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
+from .operations import OPERATIONS, run_operation
+from .streams import PdfSource, PdfTarget, TextTarget
+from .utils import default_workers
+
+# Concurrency caps for operations that are heavier than the pool size suggests.
+DEFAULT_LIMITS: Dict[str, int] = {"ocr": 2}
+
+@dataclass
+class ProgressEvent:
+    op: str
+    done: int
+    total: int
+    finished: bool = False
+    result: Any = None
+
+class _QueueProgress:
+    "Picklable progress callback forwarding (done, total) to a manager queue."
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __call__(self, done: int, total: int) -> None:
+        self.queue.put((done, total))
+
+def _pump(queue, loop: asyncio.AbstractEventLoop, op: str, callback: Callable) -> None:
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+        loop.call_soon_threadsafe(callback, ProgressEvent(op, *item))
+
+class Runner:
+    """
+    Runs pdfcraft operations off the event loop.
+
+    executor:    "process", "thread" or an existing concurrent.futures.Executor.
+    max_workers: pool size (default: CPU count); also the default per-op limit.
+    limits:      per-operation concurrency caps, merged over DEFAULT_LIMITS.
+    max_pending: cap on calls admitted at once across all operations.
+    """
+    def __init__(self, executor: str | Executor = "process", max_workers: Optional[int] = None,
+                 limits: Optional[Dict[str, int]] = None, max_pending: Optional[int] = None):
+        self.max_workers = max_workers or default_workers()
+        self._owns_executor = not isinstance(executor, Executor)
+        if isinstance(executor, Executor):
+            self._executor = executor
+            self._use_processes = isinstance(executor, ProcessPoolExecutor)
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(self.max_workers)
+            self._use_processes = True
+        elif executor == "thread":
+            self._executor = ThreadPoolExecutor(self.max_workers)
+            self._use_processes = False
+        else:
+            raise ValueError(f"Unknown executor: {executor!r}")
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._pending = asyncio.Semaphore(max_pending) if max_pending else None
+        self._manager = None
+        self._manager_lock = asyncio.Lock()
+        self._settling: Set[asyncio.Task] = set()
+
+    def _slot(self, op: str) -> asyncio.Semaphore:
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op!r}")
+        if op not in self._slots:
+            self._slots[op] = asyncio.Semaphore(self.limits.get(op, self.max_workers))
+        return self._slots[op]
+
+    async def _acquire(self, slot: asyncio.Semaphore) -> None:
+        if self._pending is not None:
+            await self._pending.acquire()
+        try:
+            await slot.acquire()
+        except BaseException:
+            if self._pending is not None:
+                self._pending.release()
+            raise
+
+    def _release(self, slot: asyncio.Semaphore) -> None:
+        slot.release()
+        if self._pending is not None:
+            self._pending.release()
+
+    def _renew_executor(self, broken: Executor) -> None:
+        "Replace an owned process pool after a worker died, so later calls still run."
+        if self._owns_executor and self._executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(self.max_workers)
+
+    async def _progress_queue(self):
+        # starting the manager process and creating proxies block; keep them off the loop
+        async with self._manager_lock:
+            if self._manager is None:
+                self._manager = await asyncio.to_thread(multiprocessing.Manager)
+        return await asyncio.to_thread(self._manager.Queue)
+
+    async def _settle(self, cfut: Future, slot: asyncio.Semaphore, queue, pump) -> None:
+        "Hold the job's slot until the executor is really done with it, then drain progress."
+        try:
+            done = asyncio.wrap_future(cfut)
+            await asyncio.wait([done])
+            # the caller sees the outcome through its own wrapper; mark this one retrieved
+            done.cancelled() or done.exception()
+            if pump is not None:
+                await asyncio.to_thread(queue.put, None)
+                await pump
+        finally:
+            self._release(slot)
+
+    async def run(self, op: str, *args, on_progress: Optional[Callable[[ProgressEvent], Any]] = None,
+                  **kwargs) -> Any:
+        """
+        Run operation `op` (a key of pdfcraft.operations.OPERATIONS) and return
+        its result. `on_progress` is called in the event loop for every page.
+        Cancelling the awaiting task drops jobs that have not started yet;
+        a job already running in a worker is allowed to finish and discarded,
+        and keeps counting against the limits until it does.
+        """
+        loop = asyncio.get_running_loop()
+        slot = self._slot(op)
+        await self._acquire(slot)
+        queue, pump = None, None
+        try:
+            progress = None
+            if on_progress is not None and self._use_processes:
+                queue = await self._progress_queue()
+                progress = _QueueProgress(queue)
+            elif on_progress is not None:
+                progress = lambda done, total: loop.call_soon_threadsafe(
+                    on_progress, ProgressEvent(op, done, total))
+            executor = self._executor
+            try:
+                cfut = executor.submit(run_operation, op, args, kwargs, progress)
+            except BrokenProcessPool:
+                self._renew_executor(executor)
+                executor = self._executor
+                cfut = executor.submit(run_operation, op, args, kwargs, progress)
+        except BaseException:
+            self._release(slot)
+            raise
+        if queue is not None:
+            pump = asyncio.ensure_future(asyncio.to_thread(_pump, queue, loop, op, on_progress))
+        settle = asyncio.ensure_future(self._settle(cfut, slot, queue, pump))
+        self._settling.add(settle)
+        settle.add_done_callback(self._settling.discard)
+        try:
+            return await asyncio.wrap_future(cfut)
+        except BrokenProcessPool:
+            self._renew_executor(executor)
+            raise
+        finally:
+            if cfut.done():
+                # deliver the last progress events before the result
+                await asyncio.shield(settle)
+
+    async def stream(self, op: str, *args, **kwargs) -> AsyncIterator[ProgressEvent]:
+        """
+        Run `op` and yield a ProgressEvent per page, then a final event with
+        finished=True and the result. Leaving the loop early cancels the job.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(self.run(op, *args, on_progress=events.put_nowait, **kwargs))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        last = ProgressEvent(op, 0, 0)
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                last = event
+                yield event
+            yield ProgressEvent(op, last.done, last.total, finished=True, result=task.result())
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    async def __aenter__(self) -> "Runner":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+_default_runner: Optional[Runner] = None
+
+def default_runner() -> Runner:
+    "Process-backed Runner shared by the module-level helpers below."
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = Runner()
+    return _default_runner
+
+def set_default_runner(runner: Optional[Runner]) -> None:
+    global _default_runner
+    _default_runner = runner
+
+async def info(path: PdfSource, fields=()) -> dict:
+    return await default_runner().run("info", path, fields)
+
+async def merge_pdfs(inputs: List[PdfSource], output: PdfTarget = None, **kwargs) -> Optional[bytes]:
+    return await default_runner().run("merge", inputs, output, **kwargs)
+
+async def split_pdf(input_path: PdfSource, ranges: str, output_dir: Optional[str],
+                    **kwargs) -> Union[List[str], List[Tuple[str, bytes]]]:
+    return await default_runner().run("split", input_path, ranges, output_dir, **kwargs)
+
+async def rotate_pages(input_path: PdfSource, output_path: PdfTarget, pages: str, angle: int,
+                       **kwargs) -> Optional[bytes]:
+    return await default_runner().run("rotate", input_path, output_path, pages, angle, **kwargs)
+
+async def extract_text(input_path: PdfSource, output_txt: TextTarget = None, **kwargs) -> Optional[str]:
+    return await default_runner().run("extract_text", input_path, output_txt, **kwargs)
+
+async def extract_images(input_path: PdfSource, output_dir: Optional[str],
+                         **kwargs) -> Union[int, List[dict]]:
+    return await default_runner().run("extract_images", input_path, output_dir, **kwargs)
+
+async def compress_pdf(input_path: PdfSource, output_path: PdfTarget = None, **kwargs) -> Optional[bytes]:
+    return await default_runner().run("compress", input_path, output_path, **kwargs)
+
+async def ocr_pdf(input_path: PdfSource, output_path: PdfTarget = None, **kwargs) -> Optional[bytes]:
+    return await default_runner().run("ocr", input_path, output_path, **kwargs)
+
+async def highlight_text(input_path: PdfSource, output_path: PdfTarget, needle: str,
+                         **kwargs) -> Union[int, Tuple[int, bytes]]:
+    return await default_runner().run("highlight", input_path, output_path, needle, **kwargs)
+
+async def watermark_text(input_path: PdfSource, output_path: PdfTarget, text: str, **kwargs) -> Optional[bytes]:
+    return await default_runner().run("watermark", input_path, output_path, text, **kwargs)
+
+async def redact_text(input_path: PdfSource, output_path: PdfTarget, needle: str,
+                      **kwargs) -> Union[int, Tuple[int, bytes]]:
+    return await default_runner().run("redact", input_path, output_path, needle, **kwargs)
+
+async def render_pages(input_path: PdfSource, output_dir: Optional[str] = None, **kwargs) -> List[dict]:
+    return await default_runner().run("render", input_path, output_dir, **kwargs)
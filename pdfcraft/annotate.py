@@ -1,26 +1,37 @@
 
 from __future__ import annotations
-import fitz  # PyMuPDF
+import pymupdf as fitz  # PyMuPDF
+from typing import Optional, Tuple, Union
+from .streams import PdfSource, PdfTarget, open_pdf, save_pdf
+from .utils import Progress
 
-def highlight_text(input_path: str, output_path: str, needle: str) -> int:
+def highlight_text(input_path: PdfSource, output_path: PdfTarget, needle: str,
+                   progress: Optional[Progress] = None) -> Union[int, Tuple[int, bytes]]:
     """
     Highlight all occurrences of 'needle' (case-insensitive) in the document.
+    output_path may be a file path or a writable binary stream; returns the
+    number of hits, or (hits, pdf bytes) when output_path is None.
     """
     hits = 0
-    with fitz.open(input_path) as doc:
-        for page in doc:
+    with open_pdf(input_path) as doc:
+        for i, page in enumerate(doc, start=1):
             for inst in page.search_for(needle, flags=fitz.TEXT_DEHYPHENATE | fitz.TEXT_IGNORECASE):
                 annot = page.add_highlight_annot(inst)
                 hits += 1
-        doc.save(output_path, incremental=False, deflate=True)
-    return hits
+            if progress:
+                progress(i, doc.page_count)
+        data = save_pdf(doc, output_path, deflate=True)
+    return hits if output_path is not None else (hits, data)
 
-def watermark_text(input_path: str, output_path: str, text: str, opacity: float = 0.15):
-    with fitz.open(input_path) as doc:
-        for page in doc:
+def watermark_text(input_path: PdfSource, output_path: PdfTarget, text: str, opacity: float = 0.15,
+                   progress: Optional[Progress] = None) -> Optional[bytes]:
+    with open_pdf(input_path) as doc:
+        for i, page in enumerate(doc, start=1):
             r = page.rect
             page.insert_text(
                 r.tl + (20, 60), text,
                 fontsize=48, rotate=45, color=(0, 0, 0), fill_opacity=opacity
             )
-        doc.save(output_path, deflate=True)
+            if progress:
+                progress(i, doc.page_count)
+        return save_pdf(doc, output_path, deflate=True)
@@ -1,85 +1,239 @@
 from __future__ import annotations
+import os
+import sys
 import typer
 from typing import List
 from pathlib import Path
 
-# NOTE: alias the module to avoid clashing with the CLI function name
-from . import core, compress as pdf_compress, ocr, annotate, redact, signing
+# Operation modules are imported lazily through the registry (see _run),
+# so commands do not pay for pytesseract/pikepdf imports they never use.
+from . import core, signing
+from .operations import resolve
+from .streams import cli_source, cli_target, is_path
+from .utils import expand_paths, read_path_list, default_workers
 
 app = typer.Typer(pretty_exceptions_show_locals=False,
                   help="PDFCraft CLI – Acrobat-like utilities.")
 
+# Set by the --server/--priority callback options; None runs operations in-process.
+_remote = {"server": None, "priority": 0}
+
+@app.callback()
+def main(server: str = typer.Option(None, envvar="PDFCRAFT_SERVER",
+                                    help="Submit jobs to a running `pdfcraft serve` (http://host:port or unix:///path)."),
+         priority: int = typer.Option(0, help="Job priority when using --server (higher runs first).")):
+    _remote["server"], _remote["priority"] = server, priority
+
+def _run(op: str, *args, **kwargs):
+    "Run operation `op` locally, or as a job on the --server if one is set."
+    if not _remote["server"]:
+        return resolve(op)(*args, **kwargs)
+    from .server import submit
+    # streams (stdout for '-') stay here: the job returns the output instead
+    stream = next((a for a in (*args, *kwargs.values()) if hasattr(a, "write")), None)
+    if stream is None:
+        return submit(_remote["server"], op, args, kwargs, priority=_remote["priority"])
+    args = [None if a is stream else a for a in args]
+    kwargs = {k: None if v is stream else v for k, v in kwargs.items()}
+    result = submit(_remote["server"], op, args, kwargs, priority=_remote["priority"])
+    hits = None
+    if isinstance(result, list) and len(result) == 2 and isinstance(result[1], bytes):
+        hits, result = result  # highlight/redact: (hits, pdf bytes)
+    stream.write(result)
+    stream.flush()
+    return hits
+
+def _path(arg: str) -> str:
+    "The server does not share our working directory; send it absolute paths."
+    return os.path.abspath(arg) if _remote["server"] else arg
+
+def _source(arg: str):
+    src = cli_source(arg)
+    return _path(src) if is_path(src) else src
+
+def _target(arg: str):
+    dst = cli_target(arg)
+    return _path(dst) if is_path(dst) else dst
+
+def _saved(output: str, prefix: str = ""):
+    "Report a written output; goes to stderr when the output itself is stdout ('-')."
+    where = "<stdout>" if output == "-" else output
+    msg = f"{prefix} Saved: {where}" if prefix else f"Saved: {where}"
+    typer.secho(msg, fg=typer.colors.GREEN, err=output == "-")
+
 @app.command()
-def info(path: str):
-    "Show basic PDF info & metadata."
-    data = core.info(path)
-    import json
-    typer.echo(json.dumps(data, indent=2))
+def info(paths: List[str] = typer.Argument(None, help="PDF files, directories or glob patterns ('-' = stdin)."),
+         files_from: str = typer.Option(None, "--files-from", help="Read paths from a file, one per line ('-' for stdin)."),
+         fields: str = typer.Option("", help="Optional fields, comma separated: toc,fonts,images,text."),
+         workers: int = typer.Option(0, help="Worker processes for bulk scans (0 = CPU count)."),
+         jsonl: bool = typer.Option(False, "--jsonl", help="Force JSONL output for a single file.")):
+    "Show basic PDF info & metadata. Many files are scanned in parallel and streamed as JSONL."
+    import itertools, json
+    field_list = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(field_list) - set(core.INFO_FIELDS))
+    if unknown:
+        raise typer.BadParameter(f"unknown field(s): {', '.join(unknown)}; choose from: "
+                                 f"{', '.join(core.INFO_FIELDS)}", param_hint="--fields")
+    paths = paths or []
+    if not paths and not files_from:
+        raise typer.BadParameter("give PDF paths, directories or globs, or --files-from", param_hint="PATHS")
+    if paths == ["-"] and not files_from:
+        rec = _run("info", _source("-"), field_list)
+        typer.echo(json.dumps(rec) if jsonl else json.dumps(rec, indent=2))
+        return
+    if len(paths) == 1 and not files_from and not jsonl and Path(paths[0]).is_file():
+        typer.echo(json.dumps(_run("info", _path(paths[0]), field_list), indent=2))
+        return
+    specs = itertools.chain(paths, read_path_list(files_from) if files_from else ())
+    failed = 0
+    for rec in core.scan_info(expand_paths(specs), field_list, workers=workers or default_workers()):
+        failed += "error" in rec
+        sys.stdout.write(json.dumps(rec) + "\n")
+        sys.stdout.flush()
+    if failed:
+        raise typer.Exit(code=1)
 
 @app.command()
 def merge(inputs: List[str], output: str):
-    "Merge PDFs: pdfcraft merge --output out.pdf in1.pdf in2.pdf ..."
-    core.merge_pdfs(inputs, output)
-    typer.secho(f"Saved: {output}", fg=typer.colors.GREEN)
+    "Merge PDFs: pdfcraft merge --output out.pdf in1.pdf in2.pdf ... ('-' = stdin/stdout)"
+    _run("merge", [_source(p) for p in inputs], _target(output))
+    _saved(output)
 
 @app.command()
 def split(input: str, ranges: str, output_dir: str = "splits"):
     "Split by page ranges, e.g., '1-3,7,10-': exports one PDF per page."
-    files = core.split_pdf(input, ranges, output_dir)
+    files = _run("split", _source(input), ranges, _path(output_dir))
     typer.secho(f"Wrote {len(files)} files to: {output_dir}", fg=typer.colors.GREEN)
 
 @app.command()
 def rotate(input: str, pages: str = "1-", angle: int = 90, output: str = "rotated.pdf"):
     "Rotate selected pages by angle (multiples of 90)."
-    core.rotate_pages(input, output, pages, angle)
-    typer.secho(f"Saved: {output}", fg=typer.colors.GREEN)
+    _run("rotate", _source(input), _target(output), pages, angle)
+    _saved(output)
 
 @app.command("extract-text")
-def extract_text_cmd(input: str, output_txt: str = "text.txt"):
-    "Extract all text to a UTF-8 .txt file."
-    core.extract_text(input, output_txt)
-    typer.secho(f"Saved: {output_txt}", fg=typer.colors.GREEN)
+def extract_text_cmd(input: str, output_txt: str = "text.txt",
+                     format: str = typer.Option("text", help="text, or jsonl with blocks/words and bounding boxes per page."),
+                     workers: int = typer.Option(1, help="Worker processes over page shards (0 = CPU count).")):
+    "Extract all text to a UTF-8 file, streamed page by page ('-' writes to stdout)."
+    _run("extract_text", _source(input), sys.stdout if output_txt == "-" else _path(output_txt),
+         fmt=format, workers=workers or default_workers())
+    _saved(output_txt)
 
 @app.command("extract-images")
-def extract_images_cmd(input: str, output_dir: str = "images"):
-    "Extract embedded images to a folder."
-    n = core.extract_images(input, output_dir)
+def extract_images_cmd(input: str, output_dir: str = "images",
+                       min_size: int = typer.Option(0, help="Skip images narrower or shorter than this (px)."),
+                       passthrough: bool = typer.Option(True, help="Keep JPEG/JPX/JBIG2/CCITT streams as stored; --no-passthrough converts all to PNG."),
+                       workers: int = typer.Option(1, help="Worker processes (0 = CPU count)."),
+                       index: bool = typer.Option(True, help="Write index.json describing the extracted files.")):
+    "Extract embedded images to a folder, without re-encoding where possible."
+    n = _run("extract_images", _source(input), _path(output_dir), min_size=min_size, passthrough=passthrough,
+             workers=workers or default_workers(), index=index)
     typer.secho(f"Extracted {n} images to: {output_dir}", fg=typer.colors.GREEN)
 
 @app.command("compress")
 def compress_cmd(input: str, output: str = "compressed.pdf", quality: int = 60, max_dpi: int = 200):
     "Compress by downsampling & recompressing images (quality 1-95; max_dpi typical 150-300)."
-    pdf_compress.compress_pdf(input, output, quality=quality, max_dpi=max_dpi)
-    typer.secho(f"Saved: {output}", fg=typer.colors.GREEN)
+    _run("compress", _source(input), _target(output), quality=quality, max_dpi=max_dpi)
+    _saved(output)
 
 @app.command()
 def ocrpdf(input: str, output: str = "ocr.pdf", dpi: int = 300, lang: str = "eng"):
     "OCR scanned PDFs to make them searchable (needs Tesseract installed)."
-    ocr.ocr_pdf(input, output, dpi=dpi, lang=lang)
-    typer.secho(f"Saved: {output}", fg=typer.colors.GREEN)
+    _run("ocr", _source(input), _target(output), dpi=dpi, lang=lang)
+    _saved(output)
 
 @app.command()
 def highlight(input: str, output: str = "highlighted.pdf", text: str = typer.Argument(...)):
     "Highlight all occurrences of TEXT."
-    n = annotate.highlight_text(input, output, text)
-    typer.secho(f"Highlighted {n} instances. Saved: {output}", fg=typer.colors.GREEN)
+    n = _run("highlight", _source(input), _target(output), text)
+    _saved(output, f"Highlighted {n} instances.")
 
 @app.command()
 def watermark(input: str, output: str = "watermarked.pdf", text: str = typer.Argument(...), opacity: float = 0.15):
     "Apply a diagonal text watermark."
-    annotate.watermark_text(input, output, text, opacity)
-    typer.secho(f"Saved: {output}", fg=typer.colors.GREEN)
+    _run("watermark", _source(input), _target(output), text, opacity)
+    _saved(output)
 
 @app.command()
 def redact(input: str, output: str = "redacted.pdf", text: str = typer.Argument(...)):
     "Redact all occurrences of TEXT (vector redaction)."
-    n = redact.redact_text(input, output, text)
-    typer.secho(f"Redacted {n} instances. Saved: {output}", fg=typer.colors.GREEN)
+    n = _run("redact", _source(input), _target(output), text)
+    _saved(output, f"Redacted {n} instances.")
+
+@app.command()
+def render(input: str, output_dir: str = typer.Option("renders", help="Folder for images ('-' streams base64 JSONL to stdout)."),
+           pages: str = "1-",
+           size: List[str] = typer.Option(["144"], help="Size preset, repeatable: 144 / 144dpi, w320, h240, 320x240."),
+           format: str = typer.Option("png", help="png, jpeg or webp."),
+           quality: int = typer.Option(85, help="JPEG/WebP quality."),
+           gray: bool = typer.Option(False, "--gray", help="Render in grayscale."),
+           clip: str = typer.Option(None, help="Page-space clip rectangle in points: x0,y0,x1,y1."),
+           workers: int = typer.Option(1, help="Worker processes across pages (0 = CPU count).")):
+    "Render pages to PNG/JPEG/WebP previews and thumbnails; prints one JSON line per image with timings."
+    import base64, json
+    from .render import render_pages
+    clip_rect = tuple(float(v) for v in clip.split(",")) if clip else None
+    if clip_rect is not None and len(clip_rect) != 4:
+        raise typer.BadParameter("clip needs four numbers: x0,y0,x1,y1")
+    out = None if output_dir == "-" else output_dir
+    options = dict(pages=pages, sizes=size, fmt=format, grayscale=gray, clip=clip_rect, quality=quality,
+                   workers=workers or default_workers())
+    if _remote["server"]:
+        records = _run("render", _source(input), out and _path(out), **options)
+    else:
+        records = render_pages(cli_source(input), out, **options)  # streamed as pages finish
+    for rec in records:
+        if "data" in rec:
+            rec["data"] = base64.b64encode(rec["data"]).decode("ascii")
+        sys.stdout.write(json.dumps(rec) + "\n")
+        sys.stdout.flush()
+
+@app.command()
+def diff(old: str, new: str,
+         pixel: bool = typer.Option(True, help="Pixel-compare pages whose fingerprints differ."),
+         dpi: int = typer.Option(50, help="Resolution for the pixel comparison."),
+         workers: int = typer.Option(0, help="Worker processes (0 = CPU count)."),
+         json_out: bool = typer.Option(False, "--json", help="Print the full report as JSON.")):
+    "Compare two PDFs page by page: inserted, deleted, moved and modified pages. Exits 1 if they differ."
+    import json
+    report = _run("diff", _source(old), _source(new), pixel=pixel, dpi=dpi, workers=workers or default_workers())
+    if json_out:
+        typer.echo(json.dumps(report, indent=2))
+    else:
+        for c in report["changes"]:
+            if c["type"] == "inserted":
+                typer.echo(f"+ page {c['b_page']} inserted")
+            elif c["type"] == "deleted":
+                typer.echo(f"- page {c['a_page']} deleted")
+            elif c["type"] == "moved":
+                typer.echo(f"> page {c['a_page']} moved to {c['b_page']}")
+            else:
+                detail = "text" if c["text_changed"] else "layout/graphics"
+                if c.get("pixel_ratio") is not None:
+                    detail += f", {c['pixel_ratio']:.2%} pixels"
+                typer.echo(f"~ page {c['a_page']} -> {c['b_page']} modified ({detail})")
+        typer.secho(f"{report['unchanged']} unchanged, {len(report['changes'])} changed "
+                    f"({report['a_pages']} -> {report['b_pages']} pages)", fg=typer.colors.GREEN, err=True)
+    if report["changes"]:
+        raise typer.Exit(code=1)
 
 @app.command()
 def sign(input: str, output: str = "signed.pdf", pfx: str = typer.Argument(...), pfx_password: str = typer.Option(..., prompt=True, hide_input=True)):
     "Digitally sign using a .pfx/.p12 (requires pyHanko CLI)."
     signing.sign_pdf(input, output, pfx, pfx_password)
 
+@app.command()
+def serve(host: str = "127.0.0.1", port: int = 8765,
+          socket: str = typer.Option(None, help="Listen on this Unix socket instead of TCP."),
+          workers: int = typer.Option(0, help="Warm worker processes (0 = CPU count)."),
+          max_queue: int = typer.Option(1000, help="Queued jobs before submissions are rejected."),
+          max_result_mb: int = typer.Option(256, help="Memory kept for finished results; oldest expire first.")):
+    "Run a local job server with warm worker processes (see --server)."
+    from .server import serve as run_server
+    run_server(host, port, unix_socket=socket, workers=workers or None, max_queue=max_queue,
+               max_result_bytes=max_result_mb * 1024 * 1024,
+               log=lambda msg: typer.secho(msg, fg=typer.colors.GREEN, err=True))
+
 if __name__ == "__main__":
     app()
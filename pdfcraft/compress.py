@@ -5,8 +5,11 @@ from typing import Optional
 from PIL import Image
 import io
 import pikepdf
+from .streams import PdfSource, PdfTarget, is_path, source_stream, write_bytes
+from .utils import Progress
 
-def _recompress_images(pdf: pikepdf.Pdf, quality: int = 60, max_dpi: int = 200):
+def _recompress_images(pdf: pikepdf.Pdf, quality: int = 60, max_dpi: int = 200,
+                       progress: Optional[Progress] = None):
     """
     Recompress embedded images to JPEG/PNG with a max DPI cap.
     Heuristic, safe-ish defaults.
@@ -40,12 +43,22 @@ def _recompress_images(pdf: pikepdf.Pdf, quality: int = 60, max_dpi: int = 200):
             except Exception as e:
                 # best-effort: skip unconvertible images
                 continue
+        if progress:
+            progress(page_index, len(pdf.pages))
 
-def compress_pdf(input_path: str, output_path: str, quality: int = 60, max_dpi: int = 200) -> None:
+def compress_pdf(input_path: PdfSource, output_path: PdfTarget = None, quality: int = 60, max_dpi: int = 200,
+                 progress: Optional[Progress] = None) -> Optional[bytes]:
     """
     Best-effort compressor based on image downsampling and recompression.
     Structure/object cleanup is handled by pikepdf on save.
+    With output_path=None the compressed PDF is returned as bytes.
     """
-    with pikepdf.open(input_path) as pdf:
-        _recompress_images(pdf, quality=quality, max_dpi=max_dpi)
-        pdf.save(output_path, linearize=True)
+    with pikepdf.open(source_stream(input_path)) as pdf:
+        _recompress_images(pdf, quality=quality, max_dpi=max_dpi, progress=progress)
+        if is_path(output_path):
+            pdf.save(output_path, linearize=True)
+            return None
+        # linearization needs a seekable target, stdout/sockets are not
+        buf = io.BytesIO()
+        pdf.save(buf, linearize=True)
+        return write_bytes(buf.getvalue(), output_path)
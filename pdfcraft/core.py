@@ -1,70 +1,317 @@
 
 from __future__ import annotations
-import fitz  # PyMuPDF
-from typing import List, Tuple, Optional
+import pymupdf as fitz  # PyMuPDF
+import json
+import struct
+from functools import partial
+from typing import Iterable, Iterator, List, Tuple, Optional, Union
 from pathlib import Path
-from .utils import parse_page_ranges
-
-def info(path: str) -> dict:
-    doc = fitz.open(path)
-    md = doc.metadata or {}
-    return {
-        "path": str(Path(path).resolve()),
-        "pages": doc.page_count,
-        "is_encrypted": doc.is_encrypted,
-        "metadata": md,
-        "toc_len": len(doc.get_toc(False))
-    }
+from .utils import Progress, parse_page_ranges, map_ordered, page_shards
+from .streams import (PdfSource, PdfTarget, TextTarget, is_path, open_pdf, save_pdf, open_text_target,
+                      source_buffer, share_sources, install_sources)
+
+INFO_FIELDS = ("toc", "fonts", "images", "text")
+
+def info(path: PdfSource, fields: Iterable[str] = ()) -> dict:
+    """
+    Basic PDF info from the trailer, xref and Info dictionary only.
+    Optional `fields` ("toc", "fonts", "images", "text") walk the outline or
+    the pages and are computed only when requested.
+    """
+    fields = set(fields)
+    unknown = fields - set(INFO_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown info field(s): {', '.join(sorted(unknown))}")
+    with open_pdf(path) as doc:
+        data = {
+            "path": str(Path(path).resolve()) if is_path(path) else None,
+            "pages": doc.page_count,
+            "is_encrypted": doc.is_encrypted,
+            "metadata": doc.metadata or {},
+        }
+        if "toc" in fields:
+            data["toc_len"] = len(doc.get_toc(False))
+        if fields & {"fonts", "images", "text"}:
+            fonts, images, has_text = set(), set(), False
+            for page in doc:
+                if "fonts" in fields:
+                    fonts.update(f[3] for f in page.get_fonts() if f[3])
+                if "images" in fields:
+                    images.update(img[0] for img in page.get_images())
+                if "text" in fields and not has_text:
+                    has_text = bool(page.get_text("text").strip())
+            if "fonts" in fields:
+                data["fonts"] = sorted(fonts)
+            if "images" in fields:
+                data["images"] = len(images)
+            if "text" in fields:
+                data["has_text"] = has_text
+    return data
+
+def _info_record(path: str, fields: Tuple[str, ...] = ()) -> dict:
+    try:
+        return info(path, fields)
+    except Exception as e:
+        return _info_error(path, e)
+
+def _info_error(path: str, e: BaseException) -> dict:
+    return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+def scan_info(paths: Iterable[str], fields: Iterable[str] = (), workers: int = 1) -> Iterator[dict]:
+    """
+    Run `info` over many files on a process pool, yielding one record per path
+    in input order. Failures, including a worker crashing on a file, are
+    reported as {"path", "error"} records instead of aborting the scan.
+    """
+    fields = tuple(fields)
+    unknown = set(fields) - set(INFO_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown info field(s): {', '.join(sorted(unknown))}")
+    yield from map_ordered(partial(_info_record, fields=fields), paths, workers, on_crash=_info_error)
 
-def merge_pdfs(inputs: List[str], output: str) -> None:
+def merge_pdfs(inputs: List[PdfSource], output: PdfTarget = None,
+               progress: Optional[Progress] = None) -> Optional[bytes]:
     out = fitz.open()
-    for p in inputs:
-        with fitz.open(p) as d:
+    for n, p in enumerate(inputs, start=1):
+        with open_pdf(p) as d:
             out.insert_pdf(d)
-    out.save(output, deflate=True)
+        if progress:
+            progress(n, len(inputs))
+    data = save_pdf(out, output, deflate=True)
+    out.close()
+    return data
 
-def split_pdf(input_path: str, ranges: str, output_dir: str) -> List[str]:
+def split_pdf(input_path: PdfSource, ranges: str, output_dir: Optional[str],
+              progress: Optional[Progress] = None) -> Union[List[str], List[Tuple[str, bytes]]]:
+    """
+    Export one PDF per selected page as page_NNNN.pdf into `output_dir` and
+    return the written paths; with output_dir=None return (name, bytes) pairs.
+    """
     out_files = []
-    with fitz.open(input_path) as doc:
+    with open_pdf(input_path) as doc:
         pages = parse_page_ranges(ranges, doc.page_count)
-        output_dir = Path(output_dir); output_dir.mkdir(parents=True, exist_ok=True)
+        if output_dir is not None:
+            output_dir = Path(output_dir); output_dir.mkdir(parents=True, exist_ok=True)
         for i, pg in enumerate(pages, start=1):
             out = fitz.open()
             out.insert_pdf(doc, from_page=pg, to_page=pg)
-            out_file = output_dir / f"page_{pg+1:04d}.pdf"
-            out.save(out_file, deflate=True)
+            name = f"page_{pg+1:04d}.pdf"
+            if output_dir is None:
+                out_files.append((name, out.tobytes(deflate=True)))
+            else:
+                out.save(output_dir / name, deflate=True)
+                out_files.append(str(output_dir / name))
             out.close()
-            out_files.append(str(out_file))
+            if progress:
+                progress(i, len(pages))
     return out_files
 
-def rotate_pages(input_path: str, output_path: str, pages: str, angle: int) -> None:
-    with fitz.open(input_path) as doc:
+def rotate_pages(input_path: PdfSource, output_path: PdfTarget, pages: str, angle: int,
+                 progress: Optional[Progress] = None) -> Optional[bytes]:
+    with open_pdf(input_path) as doc:
         targets = parse_page_ranges(pages, doc.page_count)
-        for pg in targets:
+        for n, pg in enumerate(targets, start=1):
             page = doc.load_page(pg)
             page.set_rotation((page.rotation + angle) % 360)
-        doc.save(output_path, deflate=True)
+            if progress:
+                progress(n, len(targets))
+        return save_pdf(doc, output_path, deflate=True)
 
-def extract_text(input_path: str, output_txt: str) -> None:
-    with fitz.open(input_path) as doc:
-        chunks = []
-        for i, page in enumerate(doc, start=1):
-            chunks.append(f"----- Page {i} -----\n")
-            chunks.append(page.get_text("text"))
-        Path(output_txt).write_text("".join(chunks), encoding="utf-8")
-
-def extract_images(input_path: str, output_dir: str) -> int:
-    from PIL import Image
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    count = 0
-    with fitz.open(input_path) as doc:
+TEXT_FORMATS = ("text", "jsonl")
+
+def _page_text(page: fitz.Page, fmt: str) -> str:
+    if fmt == "text":
+        return f"----- Page {page.number + 1} -----\n" + page.get_text("text")
+    r = page.rect
+    # one text page for both views; image blocks need TEXT_PRESERVE_IMAGES, as "blocks" uses
+    tp = page.get_textpage(flags=fitz.TEXTFLAGS_BLOCKS)
+    record = {
+        "page": page.number + 1,
+        "width": r.width,
+        "height": r.height,
+        "blocks": [{"bbox": [round(v, 2) for v in b[:4]], "text": b[4], "type": "image" if b[6] else "text"}
+                   for b in page.get_text("blocks", textpage=tp)],
+        "words": [{"bbox": [round(v, 2) for v in w[:4]], "text": w[4], "block": w[5], "line": w[6]}
+                  for w in page.get_text("words", textpage=tp)],
+    }
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+def _text_shard(pages: List[int], src, fmt: str) -> List[str]:
+    with open_pdf(src) as doc:
+        return [_page_text(doc.load_page(pg), fmt) for pg in pages]
+
+def extract_text(input_path: PdfSource, output_txt: TextTarget = None, fmt: str = "text",
+                 workers: int = 1, progress: Optional[Progress] = None) -> Optional[str]:
+    """
+    Extract text page by page to a UTF-8 file or text stream; with
+    output_txt=None the text is returned instead. Each page is written as soon
+    as it is extracted. fmt="jsonl" writes one JSON object per page with its
+    blocks and words and their bounding boxes (points, top-left origin).
+    With workers > 1 page shards are extracted on a process pool, in order.
+    """
+    if fmt not in TEXT_FORMATS:
+        raise ValueError(f"Unsupported text format {fmt!r}; choose from: {', '.join(TEXT_FORMATS)}")
+    out = open_text_target(output_txt)
+    try:
+        if workers <= 1:
+            with open_pdf(input_path) as doc:
+                for page in doc:
+                    out.write(_page_text(page, fmt))
+                    if progress:
+                        progress(page.number + 1, doc.page_count)
+        else:
+            if not is_path(input_path):
+                input_path = bytes(source_buffer(input_path))
+            with open_pdf(input_path) as doc:
+                total = doc.page_count
+            done = 0
+            shards = page_shards(list(range(total)), workers)
+            (src,), shared = share_sources(input_path)
+            for chunks in map_ordered(partial(_text_shard, src=src, fmt=fmt), shards, workers,
+                                      initializer=install_sources, initargs=(shared,)):
+                out.writelines(chunks)
+                done += len(chunks)
+                if progress:
+                    progress(done, total)
+        return out.getvalue() if output_txt is None else None
+    finally:
+        if output_txt is None or is_path(output_txt):
+            out.close()
+
+# Image stream filters whose raw data is already a standalone image file
+# (CCITT needs a TIFF header, JBIG2 a file header, see _wrap_raw_image).
+PASSTHROUGH_FILTERS = {"DCTDecode": "jpg", "JPXDecode": "jp2", "JBIG2Decode": "jb2", "CCITTFaxDecode": "tif"}
+
+def _pdf_name(doc: fitz.Document, xref: int, key: str) -> Optional[str]:
+    kind, value = doc.xref_get_key(xref, key)
+    if kind == "name":
+        return value.lstrip("/")
+    if kind == "array":
+        names = value.strip("[]").split()
+        if len(names) == 1:
+            return names[0].lstrip("/")
+    return None
+
+def _pdf_int(doc: fitz.Document, xref: int, key: str, default: int) -> int:
+    kind, value = doc.xref_get_key(xref, key)
+    return int(value) if kind == "int" else default
+
+def _pdf_bool(doc: fitz.Document, xref: int, key: str) -> bool:
+    return doc.xref_get_key(xref, key) == ("bool", "true")
+
+def _ccitt_tiff(data: bytes, width: int, height: int, k: int, photometric: int, byte_align: bool) -> bytes:
+    "Wrap a raw CCITT fax stream in a single-strip little-endian TIFF."
+    compression = 4 if k < 0 else 3
+    tags = [(256, 4, width), (257, 4, height), (258, 3, 1), (259, 3, compression),
+            (262, 3, photometric), (273, 4, 0), (277, 3, 1), (278, 4, height), (279, 4, len(data))]
+    if compression == 3:
+        tags.append((292, 4, (1 if k > 0 else 0) | (4 if byte_align else 0)))  # T4Options
+    data_offset = 8 + 2 + 12 * len(tags) + 4
+    ifd = struct.pack("<H", len(tags))
+    for tag, typ, value in tags:
+        value = data_offset if tag == 273 else value
+        ifd += struct.pack("<HHIHH", tag, typ, 1, value, 0) if typ == 3 else struct.pack("<HHII", tag, typ, 1, value)
+    return b"II*\x00" + struct.pack("<I", 8) + ifd + struct.pack("<I", 0) + data
+
+def _wrap_raw_image(doc: fitz.Document, xref: int, filt: str) -> Optional[Tuple[bytes, str]]:
+    """
+    The image's encoded stream as a standalone file (data, extension), or None
+    when it cannot be used without decoding.
+    """
+    raw = doc.xref_stream_raw(xref)
+    if filt == "DCTDecode":
+        return raw, "jpg"
+    if filt == "JPXDecode":
+        return raw, "jp2" if raw[4:8] == b"jP  " else "j2k"
+    if doc.xref_get_key(xref, "DecodeParms")[0] not in ("dict", "null"):
+        return None
+    if filt == "JBIG2Decode":
+        if doc.xref_get_key(xref, "DecodeParms/JBIG2Globals")[0] != "null":
+            return None  # segments live in a shared globals stream
+        # file header: sequential organisation, one page
+        return b"\x97JB2\r\n\x1a\n\x01" + struct.pack(">I", 1) + raw, "jb2"
+    if filt == "CCITTFaxDecode":
+        k = _pdf_int(doc, xref, "DecodeParms/K", 0)
+        byte_align = _pdf_bool(doc, xref, "DecodeParms/EncodedByteAlign")
+        if byte_align and k < 0:
+            return None  # TIFF has no byte-aligned G4
+        width = _pdf_int(doc, xref, "DecodeParms/Columns", _pdf_int(doc, xref, "Width", 1728))
+        height = _pdf_int(doc, xref, "Height", _pdf_int(doc, xref, "DecodeParms/Rows", 0))
+        inverted = doc.xref_get_key(xref, "Decode")[1].replace(" ", "").startswith("[1")
+        black_is_1 = _pdf_bool(doc, xref, "DecodeParms/BlackIs1")
+        photometric = 0 if black_is_1 == inverted else 1  # 0 = WhiteIsZero
+        return _ccitt_tiff(raw, width, height, k, photometric, byte_align), "tif"
+    return None
+
+def _extract_image(doc: fitz.Document, xref: int, page: int, output_dir: Optional[str], passthrough: bool) -> dict:
+    filt = _pdf_name(doc, xref, "Filter")
+    wrapped = _wrap_raw_image(doc, xref, filt) if passthrough and filt in PASSTHROUGH_FILTERS else None
+    if wrapped is not None:
+        data, ext = wrapped
+        mode = "passthrough"
+    else:
+        pix = fitz.Pixmap(doc, xref)
+        if pix.alpha or (pix.colorspace and pix.colorspace.n > 3):  # transparency / CMYK
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        data, ext, mode = pix.tobytes("png"), "png", "decoded"
+    rec = {"xref": xref, "file": f"p{page:04d}_img{xref}.{ext}", "filter": filt, "mode": mode, "bytes": len(data)}
+    if output_dir is None:
+        rec["data"] = data
+    else:
+        Path(output_dir, rec["file"]).write_bytes(data)
+    return rec
+
+def _image_shard(items: List[Tuple[int, int]], src, output_dir: Optional[str], passthrough: bool) -> List[dict]:
+    with open_pdf(src) as doc:
+        return [_extract_image(doc, xref, page, output_dir, passthrough) for xref, page in items]
+
+def extract_images(input_path: PdfSource, output_dir: Optional[str], min_size: int = 0, passthrough: bool = True,
+                   workers: int = 1, index: bool = True,
+                   progress: Optional[Progress] = None) -> Union[int, List[dict]]:
+    """
+    Extract each embedded image once, named after the first page using it.
+    JPEG, JPEG 2000, JBIG2 and CCITT (as TIFF) streams are written as stored,
+    without decoding; other images, or all with passthrough=False, are decoded
+    to PNG. Images narrower or shorter than `min_size` px are skipped. With
+    workers > 1 images are extracted on a process pool. When `index` is set an
+    index.json describing every written file is saved next to the images.
+    Returns the number of images written; with output_dir=None nothing is
+    written and the index records are returned with the image "data" bytes.
+    """
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    if workers > 1 and not is_path(input_path):
+        input_path = bytes(source_buffer(input_path))
+    found = {}
+    with open_pdf(input_path) as doc:
         for i, page in enumerate(doc, start=1):
             for img in page.get_images(full=True):
-                xref = img[0]
-                pix = fitz.Pixmap(doc, xref)
-                if pix.alpha:  # handle transparent images
-                    pix = fitz.Pixmap(fitz.csRGB, pix)
-                out = Path(output_dir)/f"p{i:04d}_img{xref}.png"
-                pix.save(out)
-                count += 1
-    return count
+                xref, width, height = img[0], img[2], img[3]
+                if width < min_size or height < min_size:
+                    continue
+                entry = found.setdefault(xref, {"width": width, "height": height, "pages": []})
+                entry["pages"].append(i)
+        items = [(xref, entry["pages"][0]) for xref, entry in found.items()]
+        if workers <= 1:
+            results = []
+            for n, (xref, page) in enumerate(items, start=1):
+                results.append(_extract_image(doc, xref, page, output_dir, passthrough))
+                if progress:
+                    progress(n, len(items))
+    if workers > 1:
+        results = []
+        (src,), shared = share_sources(input_path)
+        extract = partial(_image_shard, src=src, output_dir=output_dir, passthrough=passthrough)
+        for batch in map_ordered(extract, page_shards(items, workers), workers,
+                                 initializer=install_sources, initargs=(shared,)):
+            results.extend(batch)
+            if progress:
+                progress(len(results), len(items))
+    if index or output_dir is None:
+        for rec in results:
+            rec.update(found[rec["xref"]])
+    if output_dir is None:
+        return results
+    if index:
+        Path(output_dir, "index.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return len(results)
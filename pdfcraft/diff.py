@@ -0,0 +1,122 @@
+from __future__ import annotations
+import difflib
+import hashlib
+import re
+from collections import defaultdict
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import pymupdf as fitz  # PyMuPDF
+from .streams import PdfSource, install_sources, is_path, open_pdf, share_sources, source_buffer
+from .utils import map_ordered, page_shards
+
+def _page_fingerprint(doc: fitz.Document, page: fitz.Page) -> Tuple[str, str]:
+    """
+    (content hash, text hash) of a page. The content hash covers the content
+    streams, geometry, fonts and the raw streams of images and form XObjects;
+    the text hash covers whitespace-normalized text only.
+    """
+    h = hashlib.sha1()
+    h.update(page.read_contents())
+    h.update(repr((tuple(page.rect), page.rotation)).encode())
+    h.update(repr(sorted(f[3] for f in page.get_fonts())).encode())
+    for xref in sorted({img[0] for img in page.get_images()} | {x[0] for x in page.get_xobjects()}):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    for annot in page.annots():
+        h.update(repr((annot.type[1], tuple(annot.rect), annot.info.get("content"))).encode())
+    text = re.sub(r"\s+", " ", page.get_text("text")).strip()
+    return h.hexdigest(), hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _fingerprint_shard(pages: List[int], src) -> List[Tuple[str, str]]:
+    with open_pdf(src) as doc:
+        return [_page_fingerprint(doc, doc.load_page(pg)) for pg in pages]
+
+def fingerprint_pages(src: PdfSource, workers: int = 1) -> List[Tuple[str, str]]:
+    "Fingerprints of every page, computed over page shards on a process pool."
+    if workers > 1 and not is_path(src):
+        src = bytes(source_buffer(src))
+    with open_pdf(src) as doc:
+        if workers <= 1:
+            return [_page_fingerprint(doc, page) for page in doc]
+        total = doc.page_count
+    shards = page_shards(list(range(total)), workers, max_pages=64)
+    (handle,), shared = share_sources(src)
+    batches = map_ordered(partial(_fingerprint_shard, src=handle), shards, workers,
+                          initializer=install_sources, initargs=(shared,))
+    return [fp for batch in batches for fp in batch]
+
+def _pixel_diff(a_doc: fitz.Document, b_doc: fitz.Document, pair: Tuple[int, int], dpi: int) -> dict:
+    from PIL import Image, ImageChops
+    images = []
+    for doc, pno in ((a_doc, pair[0]), (b_doc, pair[1])):
+        pix = doc.load_page(pno).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        images.append(Image.frombytes("L", (pix.width, pix.height), pix.samples))
+    if images[0].size != images[1].size:
+        return {"pixel_ratio": 1.0, "bbox": None}
+    changed = ImageChops.difference(*images).point(lambda v: 255 if v > 32 else 0)
+    bbox = changed.getbbox()
+    scale = 72.0 / dpi
+    return {
+        "pixel_ratio": round(changed.histogram()[255] / (changed.width * changed.height), 6),
+        "bbox": [round(v * scale, 1) for v in bbox] if bbox else None,
+    }
+
+def _pixel_shard(pairs: List[Tuple[int, int]], a_src, b_src, dpi: int) -> List[dict]:
+    with open_pdf(a_src) as a_doc, open_pdf(b_src) as b_doc:
+        return [_pixel_diff(a_doc, b_doc, pair, dpi) for pair in pairs]
+
+def diff_pdfs(a_path: PdfSource, b_path: PdfSource, pixel: bool = True, dpi: int = 50,
+              workers: int = 1) -> dict:
+    """
+    Page-level comparison of two revisions of a document.
+
+    Pages are fingerprinted (content/resources hash and normalized text hash)
+    and the two sequences aligned to report inserted, deleted, moved and
+    modified pages (1-based numbers). Only modified pairs are rendered for a
+    pixel diff, so the expensive part scales with the number of changes.
+    """
+    # both passes read the sources, so streams are read into memory once up front
+    a_path = a_path if is_path(a_path) else bytes(source_buffer(a_path))
+    b_path = b_path if is_path(b_path) else bytes(source_buffer(b_path))
+    a_fp = fingerprint_pages(a_path, workers)
+    b_fp = fingerprint_pages(b_path, workers)
+    matcher = difflib.SequenceMatcher(None, a_fp, b_fp, autojunk=False)
+    opcodes = [op for op in matcher.get_opcodes() if op[0] != "equal"]
+    unchanged = sum(i2 - i1 for tag, i1, i2, _, _ in matcher.get_opcodes() if tag == "equal")
+
+    # identical pages that changed position are moves, not delete + insert
+    removed = [i for _, i1, i2, _, _ in opcodes for i in range(i1, i2)]
+    added: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for _, _, _, j1, j2 in opcodes:
+        for j in range(j1, j2):
+            added[b_fp[j]].append(j)
+    moved = {}
+    for i in removed:
+        if added.get(a_fp[i]):
+            moved[i] = added[a_fp[i]].pop(0)
+    moved_to = set(moved.values())
+
+    changes = [{"type": "moved", "a_page": i + 1, "b_page": j + 1} for i, j in moved.items()]
+    modified: List[Tuple[int, int]] = []
+    for _, i1, i2, j1, j2 in opcodes:
+        a_rest = [i for i in range(i1, i2) if i not in moved]
+        b_rest = [j for j in range(j1, j2) if j not in moved_to]
+        modified.extend(zip(a_rest, b_rest))
+        changes += [{"type": "deleted", "a_page": i + 1} for i in a_rest[len(b_rest):]]
+        changes += [{"type": "inserted", "b_page": j + 1} for j in b_rest[len(a_rest):]]
+
+    pixels: List[Optional[dict]] = [None] * len(modified)
+    if pixel and modified:
+        (a_src, b_src), shared = share_sources(a_path, b_path) if workers > 1 else ((a_path, b_path), {})
+        compare = partial(_pixel_shard, a_src=a_src, b_src=b_src, dpi=dpi)
+        batches = map_ordered(compare, page_shards(modified, workers, max_pages=8), workers,
+                              initializer=install_sources, initargs=(shared,))
+        pixels = [r for batch in batches for r in batch]
+    for (i, j), pix in zip(modified, pixels):
+        change = {"type": "modified", "a_page": i + 1, "b_page": j + 1,
+                  "text_changed": a_fp[i][1] != b_fp[j][1]}
+        if pix is not None:
+            change.update(pix)
+        changes.append(change)
+
+    changes.sort(key=lambda c: (c.get("b_page") or c.get("a_page"), c["type"]))
+    return {"a_pages": len(a_fp), "b_pages": len(b_fp), "unchanged": unchanged, "changes": changes}
@@ -2,22 +2,30 @@
 from __future__ import annotations
 from pathlib import Path
 import io
-import fitz  # PyMuPDF
+import pymupdf as fitz  # PyMuPDF
 import pytesseract
 from PIL import Image
+from typing import Optional
+from .streams import PdfSource, PdfTarget, open_pdf, save_pdf
+from .utils import Progress
 
-def ocr_pdf(input_path: str, output_path: str, dpi: int = 300, lang: str = "eng") -> None:
+def ocr_pdf(input_path: PdfSource, output_path: PdfTarget = None, dpi: int = 300, lang: str = "eng",
+            progress: Optional[Progress] = None) -> Optional[bytes]:
     """
     Render each page to an image, OCR with Tesseract, and stitch back into a searchable PDF.
+    With output_path=None the result is returned as bytes.
     """
     out = fitz.open()
-    with fitz.open(input_path) as doc:
-        for page in doc:
+    with open_pdf(input_path) as doc:
+        for i, page in enumerate(doc, start=1):
             pix = page.get_pixmap(dpi=dpi)  # render
             img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
             pdf_bytes = pytesseract.image_to_pdf_or_hocr(img, extension="pdf", lang=lang)
             p = fitz.open(stream=pdf_bytes, filetype="pdf")
             out.insert_pdf(p)
             p.close()
-    out.save(output_path, deflate=True)
+            if progress:
+                progress(i, doc.page_count)
+    data = save_pdf(out, output_path, deflate=True)
     out.close()
+    return data
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import importlib
+import inspect
+import pickle
+from typing import Any, Callable, Dict, Optional, Sequence
+from .utils import Progress
+
+# Operation name -> "module:function". Modules are imported on first use so
+# that e.g. listing operations does not pull in pytesseract or pikepdf.
+OPERATIONS: Dict[str, str] = {
+    "info": "pdfcraft.core:info",
+    "merge": "pdfcraft.core:merge_pdfs",
+    "split": "pdfcraft.core:split_pdf",
+    "rotate": "pdfcraft.core:rotate_pages",
+    "extract_text": "pdfcraft.core:extract_text",
+    "extract_images": "pdfcraft.core:extract_images",
+    "compress": "pdfcraft.compress:compress_pdf",
+    "ocr": "pdfcraft.ocr:ocr_pdf",
+    "highlight": "pdfcraft.annotate:highlight_text",
+    "watermark": "pdfcraft.annotate:watermark_text",
+    "redact": "pdfcraft.redact:redact_text",
+    "render": "pdfcraft.render:render_all",
+    "diff": "pdfcraft.diff:diff_pdfs",
+}
+
+def resolve(name: str) -> Callable:
+    try:
+        target = OPERATIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown operation: {name!r}") from None
+    module, func = target.split(":")
+    return getattr(importlib.import_module(module), func)
+
+def supports_progress(name: str) -> bool:
+    return "progress" in inspect.signature(resolve(name)).parameters
+
+def run_operation(name: str, args: Sequence[Any] = (), kwargs: Optional[dict] = None,
+                  progress: Optional[Progress] = None) -> Any:
+    """
+    Run operation `name`. Module-level and picklable, so it can be sent to
+    worker processes; `progress` is passed through only where supported.
+    Errors that could not be unpickled in the parent (which would break the
+    whole process pool) are re-raised as RuntimeError.
+    """
+    kwargs = dict(kwargs or {})
+    if progress is not None and supports_progress(name):
+        kwargs["progress"] = progress
+    try:
+        return resolve(name)(*args, **kwargs)
+    except Exception as e:
+        try:
+            pickle.loads(pickle.dumps(e))
+        except Exception:
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+        raise
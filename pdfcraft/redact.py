@@ -1,19 +1,27 @@
 
 from __future__ import annotations
-import fitz  # PyMuPDF
+import pymupdf as fitz  # PyMuPDF
+from typing import Optional, Tuple, Union
+from .streams import PdfSource, PdfTarget, open_pdf, save_pdf
+from .utils import Progress
 
-def redact_text(input_path: str, output_path: str, needle: str) -> int:
+def redact_text(input_path: PdfSource, output_path: PdfTarget, needle: str,
+                progress: Optional[Progress] = None) -> Union[int, Tuple[int, bytes]]:
     """
     Find text occurrences and apply vector redaction (not just draw a box).
+    output_path may be a file path or a writable binary stream; returns the
+    number of hits, or (hits, pdf bytes) when output_path is None.
     """
     hits = 0
-    with fitz.open(input_path) as doc:
-        for page in doc:
+    with open_pdf(input_path) as doc:
+        for i, page in enumerate(doc, start=1):
             rects = page.search_for(needle, flags=fitz.TEXT_DEHYPHENATE | fitz.TEXT_IGNORECASE)
             for r in rects:
                 page.add_redact_annot(r, fill=(0, 0, 0))
                 hits += 1
             if rects:
                 page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
-        doc.save(output_path, deflate=True)
-    return hits
+            if progress:
+                progress(i, doc.page_count)
+        data = save_pdf(doc, output_path, deflate=True)
+    return hits if output_path is not None else (hits, data)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import io
+import re
+import time
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+import pymupdf as fitz  # PyMuPDF
+from .streams import PdfSource, install_sources, is_path, open_pdf, share_sources, source_buffer
+from .utils import Progress, map_ordered, page_shards, parse_page_ranges
+
+FORMATS = {"png": "png", "jpeg": "jpg", "jpg": "jpg", "webp": "webp"}
+
+def parse_size(spec: str) -> Tuple[str, float, float]:
+    """
+    Parse a size preset: "144" or "144dpi" (resolution), "w320" (width in px),
+    "h240" (height in px) or "320x240" (fit inside a box).
+    Returns (kind, a, b) with kind one of "dpi", "w", "h", "box".
+    """
+    s = spec.strip().lower()
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)(?:dpi)?", s)
+    if m:
+        return "dpi", float(m.group(1)), 0.0
+    m = re.fullmatch(r"([wh])(\d+)", s)
+    if m:
+        return m.group(1), float(m.group(2)), 0.0
+    m = re.fullmatch(r"(\d+)x(\d+)", s)
+    if m:
+        return "box", float(m.group(1)), float(m.group(2))
+    raise ValueError(f"Bad size preset: {spec!r} (use e.g. 144, 144dpi, w320, h240, 320x240)")
+
+def _zoom(spec: str, rect: fitz.Rect) -> float:
+    kind, a, b = parse_size(spec)
+    if kind == "dpi":
+        return a / 72.0
+    if kind == "w":
+        return a / rect.width
+    if kind == "h":
+        return a / rect.height
+    return min(a / rect.width, b / rect.height)
+
+def _encode(pix: fitz.Pixmap, fmt: str, quality: int) -> bytes:
+    if fmt == "png":
+        return pix.tobytes("png")
+    if fmt == "jpg":
+        return pix.tobytes("jpg", jpg_quality=quality)
+    from PIL import Image
+    mode = "L" if pix.n == 1 else "RGB"
+    buf = io.BytesIO()
+    Image.frombytes(mode, (pix.width, pix.height), pix.samples).save(buf, format="WEBP", quality=quality)
+    return buf.getvalue()
+
+def _iter_render(doc: fitz.Document, pages: List[int], output_dir: Optional[str], sizes: Sequence[str],
+                 fmt: str, grayscale: bool, clip: Optional[Tuple[float, float, float, float]],
+                 quality: int) -> Iterator[dict]:
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    for pg in pages:
+        page = doc.load_page(pg)
+        t0 = time.perf_counter()
+        # interpret the page once, then rasterize every size from the list
+        dlist = page.get_displaylist()
+        list_ms = (time.perf_counter() - t0) * 1000
+        area = fitz.Rect(clip) & page.rect if clip else page.rect
+        if area.is_empty:
+            raise ValueError(f"Clip {tuple(clip)} does not intersect page {pg + 1}")
+        for size in sizes:
+            zoom = _zoom(size, area)
+            t1 = time.perf_counter()
+            pix = dlist.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace,
+                                   alpha=False, clip=area)
+            t2 = time.perf_counter()
+            data = _encode(pix, fmt, quality)
+            t3 = time.perf_counter()
+            rec = {
+                "page": pg + 1, "size": size, "width": pix.width, "height": pix.height,
+                "format": fmt, "list_ms": round(list_ms, 3),
+                "render_ms": round((t2 - t1) * 1000, 3), "encode_ms": round((t3 - t2) * 1000, 3),
+            }
+            if output_dir is None:
+                rec["data"] = data
+            else:
+                label = re.sub(r"[^0-9a-z]+", "", size.lower())
+                out = Path(output_dir) / f"page_{pg+1:04d}_{label}.{fmt}"
+                out.write_bytes(data)
+                rec["path"] = str(out)
+            yield rec
+
+def _render_shard(pages: List[int], src, **options) -> List[dict]:
+    with open_pdf(src) as doc:
+        return list(_iter_render(doc, pages, **options))
+
+def render_pages(input_path: PdfSource, output_dir: Optional[str] = None, pages: str = "1-",
+                 sizes: Sequence[str] = ("144",), fmt: str = "png", grayscale: bool = False,
+                 clip: Optional[Tuple[float, float, float, float]] = None, quality: int = 85,
+                 workers: int = 1, progress: Optional[Progress] = None) -> Iterator[dict]:
+    """
+    Render pages to PNG/JPEG/WebP images, one per page and size preset.
+    Each page is interpreted once into a display list that is reused for all
+    sizes. `clip` is a page-space rectangle (x0, y0, x1, y1) in points.
+    Yields one record per image in page order, with timings in ms and either
+    the written "path" or, when output_dir is None, the encoded "data" bytes.
+    """
+    fmt = FORMATS.get(fmt.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported format; choose from: {', '.join(FORMATS)}")
+    for size in sizes:
+        parse_size(size)
+    options = dict(output_dir=output_dir, sizes=list(sizes), fmt=fmt, grayscale=grayscale,
+                   clip=clip, quality=quality)
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    if workers <= 1:
+        with open_pdf(input_path) as doc:
+            targets = parse_page_ranges(pages, doc.page_count)
+            for n, pg in enumerate(targets, start=1):
+                yield from _iter_render(doc, [pg], **options)
+                if progress:
+                    progress(n, len(targets))
+        return
+    if not is_path(input_path):
+        # workers get a picklable copy of in-memory sources, once each
+        input_path = bytes(source_buffer(input_path))
+    with open_pdf(input_path) as doc:
+        targets = parse_page_ranges(pages, doc.page_count)
+    # each task opens the document once per shard; map_ordered keeps page order
+    done = 0
+    shards = page_shards(targets, workers)
+    (src,), shared = share_sources(input_path)
+    for records in map_ordered(partial(_render_shard, src=src, **options), shards, workers,
+                               initializer=install_sources, initargs=(shared,)):
+        yield from records
+        done += len({r["page"] for r in records})
+        if progress:
+            progress(done, len(targets))
+
+def render_all(input_path: PdfSource, output_dir: Optional[str] = None, progress: Optional[Progress] = None,
+               **options) -> List[dict]:
+    "render_pages() collected into a list, for the job server and pdfcraft.aio."
+    return list(render_pages(input_path, output_dir, progress=progress, **options))
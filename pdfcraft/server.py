@@ -0,0 +1,426 @@
+"""
+Local job server: `pdfcraft serve`.
+
+Jobs are {"op", "args", "kwargs", "priority"} documents naming an operation
+from pdfcraft.operations. They wait in a bounded priority queue (higher
+priority first, FIFO within a priority) and run on a pool of worker
+processes that are started and have their heavy imports done up front.
+
+HTTP API (TCP or Unix socket):
+    POST   /jobs                submit, 202 {"id", "status"}; 503 when the queue is full
+    GET    /jobs/<id>?wait=S    status, long-polling up to S seconds for completion
+    GET    /jobs/<id>/result    raw result (PDF/text bytes) once done; 410 once expired
+    DELETE /jobs/<id>           cancel a queued job
+    GET    /metrics             queue depth, latency percentiles, throughput
+    GET    /operations          available job types
+
+Results are kept until their total size exceeds a budget, oldest dropped
+first; the job then reports "result_expired". Bytes travel as {"$b64": "..."}
+in both directions. Paths are used as given, relative to the server's working
+directory, so clients send absolute paths.
+"""
+from __future__ import annotations
+import base64
+import http.client
+import itertools
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from .operations import OPERATIONS, run_operation
+
+THROUGHPUT_WINDOW = 60.0  # seconds
+MAX_RESULT_BYTES = 256 * 1024 * 1024
+
+def encode(obj: Any) -> Any:
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {"$b64": base64.b64encode(bytes(obj)).decode("ascii")}
+    if isinstance(obj, (list, tuple)):
+        return [encode(o) for o in obj]
+    if isinstance(obj, dict):
+        return {k: encode(v) for k, v in obj.items()}
+    return obj
+
+def decode(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        if set(obj) == {"$b64"}:
+            return base64.b64decode(obj["$b64"])
+        return {k: decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode(o) for o in obj]
+    return obj
+
+def _warm_worker() -> None:
+    "Pool initializer: pay the heavy imports once per worker, not per job."
+    import pymupdf  # noqa: F401
+    from . import core, annotate, redact  # noqa: F401
+    try:
+        from . import compress, ocr  # noqa: F401
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception:
+        pass  # optional dependencies; jobs using them will report the error
+
+def _ping() -> int:
+    return os.getpid()
+
+@dataclass
+class Job:
+    op: str
+    args: list
+    kwargs: dict
+    priority: int = 0
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Any = None
+    result_expired: bool = False
+    error: Optional[str] = None
+    done_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self, with_result: bool = True) -> dict:
+        data = {
+            "id": self.id, "op": self.op, "priority": self.priority, "status": self.status,
+            "submitted": self.submitted, "started": self.started, "finished": self.finished,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.result_expired:
+            data["result_expired"] = True
+        elif with_result and self.status == "done":
+            data["result"] = encode(self.result)
+        return data
+
+def _result_size(obj: Any) -> int:
+    if isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return len(obj)
+    if isinstance(obj, (list, tuple)):
+        return sum(_result_size(o) for o in obj)
+    if isinstance(obj, dict):
+        return sum(_result_size(o) for o in obj.values())
+    return 0
+
+def _percentile(sorted_values, pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+class JobQueue:
+    """
+    Bounded priority queue feeding a warm process pool with at most `workers`
+    jobs in flight. Finished jobs are kept (up to `history`) for retrieval;
+    their results only while they total at most `max_result_bytes`.
+    """
+    def __init__(self, workers: int, max_queue: int = 1000, history: int = 10000,
+                 max_result_bytes: int = MAX_RESULT_BYTES):
+        self.workers = workers
+        # cancelled entries stay in the heap until dequeued, so the bound is
+        # enforced on the count of jobs still queued rather than on its size
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._max_queue = max_queue
+        self._queued = 0
+        self._seq = itertools.count()
+        self._slots = threading.Semaphore(workers)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._finished: deque = deque()
+        self._history = history
+        self._results: deque = deque()  # (job, size) of retained results, oldest first
+        self._result_bytes = 0
+        self._max_result_bytes = max_result_bytes
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+        # finish times within the last THROUGHPUT_WINDOW, independent of the sample cap
+        self._recent: Dict[str, deque] = defaultdict(deque)
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._pool = self._start_pool()
+        self._stop = threading.Event()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="pdfcraft-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(self.workers, initializer=_warm_worker)
+        # spawn every worker now so the first jobs do not pay for it
+        for f in [pool.submit(_ping) for _ in range(self.workers)]:
+            f.result()
+        return pool
+
+    def submit(self, job: Job) -> Job:
+        if job.op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {job.op!r}")
+        with self._lock:
+            if self._queued >= self._max_queue:
+                raise queue.Full
+            self._queued += 1
+            self._jobs[job.id] = job
+        self._queue.put_nowait((-job.priority, next(self._seq), job.id))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return False
+            job.status = "cancelled"
+            self._queued -= 1
+        self._finish(job)
+        return True
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            # take a worker slot first so the highest priority job at that
+            # moment is the one dequeued
+            if not self._slots.acquire(timeout=0.5):
+                continue
+            try:
+                _, _, job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                self._slots.release()
+                continue
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    self._slots.release()
+                    continue
+                job.status, job.started = "running", time.time()
+                self._queued -= 1
+            try:
+                fut = self._pool.submit(run_operation, job.op, job.args, job.kwargs)
+            except BrokenProcessPool:
+                self._pool = self._start_pool()
+                fut = self._pool.submit(run_operation, job.op, job.args, job.kwargs)
+            fut.add_done_callback(lambda f, job=job: self._on_done(job, f))
+
+    def _on_done(self, job: Job, fut) -> None:
+        try:
+            job.result = fut.result()
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        self._slots.release()
+        self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        job.finished = time.time()
+        with self._lock:
+            self._counts[job.op][job.status] += 1
+            if job.started is not None:
+                self._samples[job.op].append((job.finished - job.submitted, job.finished - job.started))
+                self._recent[job.op].append(job.finished)
+                self._expire_recent(job.op, job.finished)
+            self._finished.append(job.id)
+            while len(self._finished) > self._history:
+                self._jobs.pop(self._finished.popleft(), None)
+            if job.status == "done":
+                size = _result_size(job.result)
+                self._results.append((job, size))
+                self._result_bytes += size
+                while self._result_bytes > self._max_result_bytes and len(self._results) > 1:
+                    old, old_size = self._results.popleft()
+                    old.result, old.result_expired = None, True
+                    self._result_bytes -= old_size
+        job.done_event.set()
+
+    def _expire_recent(self, op: str, now: float) -> None:
+        recent = self._recent[op]
+        while recent and now - recent[0] > THROUGHPUT_WINDOW:
+            recent.popleft()
+
+    def metrics(self) -> dict:
+        now = time.time()
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if j.status == "running")
+            ops = {}
+            for op, samples in self._samples.items():
+                latency = sorted(s[0] for s in samples)
+                runtime = sorted(s[1] for s in samples)
+                self._expire_recent(op, now)
+                ops[op] = {
+                    "counts": dict(self._counts[op]),
+                    "latency": {f"p{p}": _percentile(latency, p) for p in (50, 90, 99)},
+                    "runtime": {f"p{p}": _percentile(runtime, p) for p in (50, 90, 99)},
+                    "throughput_per_s": len(self._recent[op]) / THROUGHPUT_WINDOW,
+                }
+            for op, counts in self._counts.items():
+                ops.setdefault(op, {"counts": dict(counts)})
+        return {"queue_depth": self._queued, "running": running, "result_bytes": self._result_bytes,
+                "workers": self.workers, "operations": ops}
+
+    def close(self) -> None:
+        self._stop.set()
+        self._dispatcher.join()  # no submissions to a pool being shut down
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "pdfcraft"
+    jobs: JobQueue  # set on the server-specific subclass
+
+    def address_string(self) -> str:
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send(self, code: int, payload: Any = None, body: bytes = None, ctype: str = "application/json"):
+        if body is None:
+            body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_path(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        job = self.jobs.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+        return parts, job
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/metrics":
+            return self._send(200, self.jobs.metrics())
+        if url.path == "/operations":
+            return self._send(200, sorted(OPERATIONS))
+        parts, job = self._job_path()
+        if job is None:
+            return self._send(404, {"error": "not found"})
+        try:
+            wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+        except ValueError:
+            return self._send(400, {"error": "wait must be a number of seconds"})
+        if wait > 0:
+            job.done_event.wait(wait)
+        if len(parts) == 3 and parts[2] == "result":
+            if job.status != "done":
+                return self._send(409, job.to_dict(with_result=False))
+            if job.result_expired:
+                return self._send(410, job.to_dict(with_result=False))
+            if isinstance(job.result, (bytes, bytearray)):
+                return self._send(200, body=bytes(job.result), ctype="application/octet-stream")
+            if isinstance(job.result, str):
+                return self._send(200, body=job.result.encode("utf-8"), ctype="text/plain; charset=utf-8")
+            return self._send(200, encode(job.result))
+        return self._send(200, job.to_dict())
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            job = Job(op=spec["op"], args=decode(spec.get("args", [])), kwargs=decode(spec.get("kwargs", {})),
+                      priority=int(spec.get("priority", 0)))
+            self.jobs.submit(job)
+        except queue.Full:
+            return self._send(503, {"error": "queue full"})
+        except (KeyError, ValueError, TypeError) as e:
+            return self._send(400, {"error": f"{type(e).__name__}: {e}"})
+        self._send(202, {"id": job.id, "status": job.status})
+
+    def do_DELETE(self):
+        _, job = self._job_path()
+        if job is None:
+            return self._send(404, {"error": "not found"})
+        if not self.jobs.cancel(job.id):
+            return self._send(409, job.to_dict(with_result=False))
+        self._send(200, job.to_dict(with_result=False))
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None,
+          workers: Optional[int] = None, max_queue: int = 1000,
+          max_result_bytes: int = MAX_RESULT_BYTES, log=print) -> None:
+    """
+    Run the job server until interrupted.
+    """
+    from .utils import default_workers
+    jobs = JobQueue(workers or default_workers(), max_queue=max_queue, max_result_bytes=max_result_bytes)
+    handler = type("Handler", (_Handler,), {"jobs": jobs})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        httpd = UnixHTTPServer(unix_socket, handler)
+        where = f"unix://{unix_socket}"
+    else:
+        httpd = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{port}"
+    log(f"pdfcraft job server on {where} with {jobs.workers} workers")
+    try:
+        # shut down cleanly (and remove the socket file) on SIGTERM too
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=httpd.shutdown).start())
+    except ValueError:
+        pass  # not in the main thread
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        jobs.close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+def _request(server: str, method: str, path: str, payload: Any = None):
+    url = urlparse(server)
+    if url.scheme == "unix":
+        conn = _UnixConnection(url.path)
+    else:
+        conn = http.client.HTTPConnection(url.hostname or "127.0.0.1", url.port or 8765)
+    try:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read() or b"null")
+    finally:
+        conn.close()
+
+def submit(server: str, op: str, args=(), kwargs=None, priority: int = 0, wait: bool = True,
+           poll: float = 30.0) -> Any:
+    """
+    Submit a job to a running server (http://host:port or unix:///path).
+    With wait=True block until it finishes and return its result (raising
+    RuntimeError if it failed); otherwise return the job id.
+    """
+    status, data = _request(server, "POST", "/jobs", {
+        "op": op, "args": encode(list(args)), "kwargs": encode(kwargs or {}),
+        "priority": priority,
+    })
+    if status != 202:
+        raise RuntimeError(f"Job rejected ({status}): {data.get('error')}")
+    if not wait:
+        return data["id"]
+    while True:
+        _, data = _request(server, "GET", f"/jobs/{data['id']}?wait={poll}")
+        if data["status"] == "done":
+            if data.get("result_expired"):
+                raise RuntimeError(f"Job {data['id']} result expired")
+            return decode(data.get("result"))
+        if data["status"] in ("failed", "cancelled"):
+            raise RuntimeError(f"Job {data['id']} {data['status']}: {data.get('error', '')}")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import io
+import mmap
+import os
+import sys
+import uuid
+from typing import BinaryIO, Dict, List, Optional, TextIO, Tuple, Union
+import pymupdf as fitz  # PyMuPDF; newer releases print a notice to stdout on `import fitz`
+
+# Anything an operation can read a PDF from / write a result to.
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+PdfTarget = Union[str, os.PathLike, BinaryIO, None]
+TextTarget = Union[str, os.PathLike, TextIO, None]
+
+def is_path(obj) -> bool:
+    return isinstance(obj, (str, os.PathLike))
+
+def source_buffer(src: PdfSource):
+    """
+    Return an in-memory view of a non-path source without copying where possible:
+    bytes-like objects are returned as is, mmaps are wrapped in a memoryview and
+    file-like objects are read to the end.
+    """
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return src
+    if isinstance(src, mmap.mmap):
+        return memoryview(src)
+    if hasattr(src, "read"):
+        return src.read()
+    raise TypeError(f"Unsupported PDF source: {type(src).__name__}")
+
+def source_stream(src: PdfSource):
+    """
+    Path or seekable binary stream for libraries that read files (e.g. pikepdf).
+    """
+    if is_path(src):
+        return src
+    if hasattr(src, "read") and hasattr(src, "seekable") and src.seekable():
+        return src
+    return io.BytesIO(source_buffer(src))
+
+class SharedSource:
+    "Picklable handle for an in-memory PDF installed in pool workers by install_sources()."
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+# Buffers installed in this (worker) process, by SharedSource key.
+_shared: Dict[str, bytes] = {}
+
+def share_sources(*sources: PdfSource) -> Tuple[List, Dict[str, bytes]]:
+    """
+    Prepare sources for a process pool. Paths are kept; bytes are swapped for
+    SharedSource handles. Pass the returned dict as the initargs of
+    install_sources so each worker receives the data once, not with every task.
+    """
+    handles, shared = [], {}
+    for src in sources:
+        if is_path(src):
+            handles.append(src)
+        else:
+            key = uuid.uuid4().hex
+            shared[key] = src
+            handles.append(SharedSource(key))
+    return handles, shared
+
+def install_sources(shared: Dict[str, bytes]) -> None:
+    "Pool initializer for share_sources()."
+    _shared.update(shared)
+
+def open_pdf(src: PdfSource) -> fitz.Document:
+    """
+    Open a PDF from a path, bytes-like object, mmap, binary file object or,
+    in a pool worker, a SharedSource handle.
+    """
+    if is_path(src):
+        return fitz.open(src)
+    if isinstance(src, SharedSource):
+        return fitz.open(stream=_shared[src.key], filetype="pdf")
+    return fitz.open(stream=source_buffer(src), filetype="pdf")
+
+def write_bytes(data: bytes, dst: PdfTarget) -> Optional[bytes]:
+    """
+    Write `data` to a path or binary stream; with dst=None return it instead.
+    """
+    if dst is None:
+        return data
+    if is_path(dst):
+        with open(dst, "wb") as f:
+            f.write(data)
+    else:
+        dst.write(data)
+        if hasattr(dst, "flush"):
+            dst.flush()
+    return None
+
+def save_pdf(doc: fitz.Document, dst: PdfTarget, **options) -> Optional[bytes]:
+    """
+    Save `doc` to a path, to a binary stream, or (dst=None) return the bytes.
+    """
+    if is_path(dst):
+        doc.save(dst, **options)
+        return None
+    return write_bytes(doc.tobytes(**options), dst)
+
+def open_text_target(dst: TextTarget) -> TextIO:
+    """
+    Text stream for `dst`: a new UTF-8 file for paths, the stream itself for
+    text streams and a StringIO when dst is None. Close only what you opened.
+    """
+    if dst is None:
+        return io.StringIO()
+    if is_path(dst):
+        return open(dst, "w", encoding="utf-8")
+    return dst
+
+def cli_source(arg: str) -> PdfSource:
+    "Map the CLI's '-' to the bytes on stdin; anything else is a path."
+    return sys.stdin.buffer.read() if arg == "-" else arg
+
+def cli_target(arg: str) -> PdfTarget:
+    "Map the CLI's '-' to stdout's binary buffer; anything else is a path."
+    return sys.stdout.buffer if arg == "-" else arg
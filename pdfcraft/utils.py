@@ -1,6 +1,20 @@
 
 from __future__ import annotations
-from typing import List, Tuple
+import glob
+import itertools
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Per-page progress callback: progress(done, total).
+Progress = Callable[[int, int], None]
 
 def parse_page_ranges(spec: str, num_pages: int) -> List[int]:
     """
@@ -25,3 +39,106 @@ def parse_page_ranges(spec: str, num_pages: int) -> List[int]:
 
 def clamp(n: int, lo: int, hi: int) -> int:
     return max(lo, min(n, hi))
+
+def expand_paths(specs: Iterable[str], recursive: bool = True) -> Iterator[str]:
+    """
+    Expand a mix of file paths, directories and glob patterns into file paths.
+    Directories yield the PDFs below them. Paths are produced lazily so very
+    large archives can be streamed without building the full list first.
+    """
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        if glob.has_magic(spec):
+            yield from glob.iglob(spec, recursive=recursive)
+        elif os.path.isdir(spec):
+            # match the suffix in any case: archives often hold ".PDF" files
+            for p in Path(spec).glob("**/*" if recursive else "*"):
+                if p.suffix.lower() == ".pdf" and p.is_file():
+                    yield str(p)
+        else:
+            yield spec
+
+def read_path_list(list_file: str) -> Iterator[str]:
+    """
+    Yield one path per line from a text file ("-" reads stdin).
+    Blank lines and lines starting with "#" are skipped.
+    """
+    f = sys.stdin if list_file == "-" else open(list_file, encoding="utf-8")
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _isolated(func: Callable[[T], R], item: T, on_crash: Callable[[T, BaseException], R],
+              pool_options: dict) -> R:
+    "Re-run one item alone, so a crash can be pinned on the item that caused it."
+    with ProcessPoolExecutor(1, **pool_options) as pool:
+        try:
+            return pool.submit(func, item).result()
+        except BrokenProcessPool as e:
+            return on_crash(item, e)
+
+def map_ordered(func: Callable[[T], R], items: Iterable[T], workers: int = 1,
+                on_crash: Optional[Callable[[T, BaseException], R]] = None,
+                initializer: Optional[Callable[..., None]] = None, initargs: tuple = ()) -> Iterator[R]:
+    """
+    Apply `func` to `items` and yield results in input order.
+    With workers > 1 the calls run on a process pool and results are streamed
+    as they complete; `func` must then be a picklable module-level function.
+    Only a few items per worker are in flight, so `items` may be a long lazy
+    iterator. If a worker process dies (e.g. a native crash) and `on_crash` is
+    given, the items that were in flight are retried one by one on a fresh
+    pool and `on_crash(item, error)` supplies the result for the culprit;
+    without it BrokenProcessPool is raised. `initializer(*initargs)` runs
+    once in every worker, e.g. to hand over data shared by all items.
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    items = iter(items)
+    pending: deque = deque()
+    pool_options = dict(initializer=initializer, initargs=initargs)
+    pool = ProcessPoolExecutor(workers, **pool_options)
+
+    def refill():
+        for item in itertools.islice(items, workers * 4 - len(pending)):
+            pending.append((item, pool.submit(func, item)))
+
+    try:
+        refill()
+        while pending:
+            item, fut = pending.popleft()
+            try:
+                result = fut.result()
+            except BrokenProcessPool:
+                if on_crash is None:
+                    raise
+                pool.shutdown(wait=False, cancel_futures=True)
+                result = _isolated(func, item, on_crash, pool_options)
+                pool = ProcessPoolExecutor(workers, **pool_options)
+                pending = deque((i, pool.submit(func, i)) for i, _ in pending)
+            yield result
+            refill()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+def page_shards(pages: List[T], workers: int, max_pages: int = 16) -> List[List[T]]:
+    """
+    Split `pages` into contiguous shards for `workers` processes: a few shards
+    per worker to balance load, and at most `max_pages` pages each so ordered
+    results keep streaming instead of arriving in a few large batches.
+    """
+    if not pages:
+        return []
+    n = min(len(pages), max(workers * 4, -(-len(pages) // max_pages)))
+    return [pages[i * len(pages) // n:(i + 1) * len(pages) // n] for i in range(n)]
@@ -0,0 +1,133 @@
+import asyncio
+import gc
+import pickle
+import threading
+import time
+
+import pymupdf
+import pytest
+
+from pdfcraft import operations
+from pdfcraft.aio import Runner
+from pdfcraft.operations import run_operation
+
+class _Unpicklable(Exception):
+    def __init__(self):  # like pytesseract's TesseractNotFoundError
+        super().__init__("needs a binary that is not installed")
+
+def _fail():
+    raise _Unpicklable()
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = pymupdf.open()
+    for n in range(3):
+        doc.new_page().insert_text((72, 72), f"page {n + 1}")
+    path = tmp_path / "doc.pdf"
+    doc.save(path)
+    return str(path)
+
+def test_run_operation_makes_errors_picklable(monkeypatch):
+    monkeypatch.setitem(operations.OPERATIONS, "fail", f"{__name__}:_fail")
+    with pytest.raises(RuntimeError, match="_Unpicklable: needs a binary") as info:
+        run_operation("fail")
+    pickle.loads(pickle.dumps(info.value))
+
+def test_run_operation_keeps_picklable_errors(pdf_path):
+    with pytest.raises(ValueError):
+        run_operation("info", (pdf_path, ["nope"]))
+
+def test_runner_recovers_from_broken_pool(pdf_path):
+    async def main():
+        async with Runner(max_workers=2) as runner:
+            assert (await runner.run("info", pdf_path))["pages"] == 3
+            for proc in list(runner._executor._processes.values()):
+                proc.kill()
+            try:
+                await runner.run("info", pdf_path)
+            except Exception:
+                pass  # the job in flight when the pool broke may fail
+            return await runner.run("info", pdf_path)
+    assert asyncio.run(main())["pages"] == 3
+
+def test_failed_job_leaves_no_unretrieved_exception(tmp_path):
+    unhandled = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: unhandled.append(ctx))
+        async with Runner("thread") as runner:
+            with pytest.raises(Exception):
+                await runner.run("info", str(tmp_path / "missing.pdf"))
+            await asyncio.sleep(0.05)  # let the slot settle
+        gc.collect()
+    asyncio.run(main())
+    assert unhandled == []
+
+_probe_state = {"running": 0, "peak": 0, "calls": 0}
+_probe_lock = threading.Lock()
+
+def _probe(delay=0.05, progress=None):
+    with _probe_lock:
+        _probe_state["calls"] += 1
+        _probe_state["running"] += 1
+        _probe_state["peak"] = max(_probe_state["peak"], _probe_state["running"])
+    time.sleep(delay)
+    if progress:
+        progress(1, 1)
+    with _probe_lock:
+        _probe_state["running"] -= 1
+    return delay
+
+@pytest.fixture
+def probe(monkeypatch):
+    "A slow thread-executor operation that records how many copies run at once."
+    monkeypatch.setitem(operations.OPERATIONS, "probe", f"{__name__}:_probe")
+    _probe_state.update(running=0, peak=0, calls=0)
+    return _probe_state
+
+def test_runner_per_operation_limit(probe):
+    async def main():
+        async with Runner("thread", max_workers=8, limits={"probe": 2}) as runner:
+            return await asyncio.gather(*(runner.run("probe") for _ in range(6)))
+    assert asyncio.run(main()) == [0.05] * 6
+    assert probe["peak"] == 2
+
+def test_runner_max_pending(probe):
+    async def main():
+        async with Runner("thread", max_workers=8, max_pending=3) as runner:
+            await asyncio.gather(*(runner.run("probe") for _ in range(9)))
+    asyncio.run(main())
+    assert probe["peak"] == 3
+
+def test_cancelled_running_job_keeps_its_slot(probe):
+    async def main():
+        async with Runner("thread", max_workers=4, limits={"probe": 1}) as runner:
+            task = asyncio.ensure_future(runner.run("probe", 0.3))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            held = runner._slots["probe"].locked()
+            waiting = asyncio.ensure_future(runner.run("probe", 0.0))  # queued, never started
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            await asyncio.sleep(0.4)
+            return held, runner._slots["probe"].locked()
+    assert asyncio.run(main()) == (True, False)
+    assert probe["calls"] == 1 and probe["peak"] == 1
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_stream_reports_progress_then_result(pdf_path, executor):
+    async def main():
+        async with Runner(executor, max_workers=2) as runner:
+            return [event async for event in runner.stream("extract_text", pdf_path, None)]
+    events = asyncio.run(main())
+    assert [(e.done, e.total) for e in events[:-1]] == [(1, 3), (2, 3), (3, 3)]
+    assert events[-1].finished and "page 3" in events[-1].result
+
+def test_unknown_operation(pdf_path):
+    async def main():
+        async with Runner("thread") as runner:
+            await runner.run("nope", pdf_path)
+    with pytest.raises(ValueError):
+        asyncio.run(main())
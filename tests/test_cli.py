@@ -0,0 +1,38 @@
+import json
+
+import pymupdf
+from typer.testing import CliRunner
+
+from pdfcraft.cli import app
+
+runner = CliRunner()
+
+def _pdf(pages=2):
+    doc = pymupdf.open()
+    for n in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {n + 1}")
+    return doc.tobytes()
+
+def test_info_reads_stdin():
+    result = runner.invoke(app, ["info", "-"], input=_pdf(2))
+    assert result.exit_code == 0
+    data = json.loads(result.stdout)
+    assert data["pages"] == 2 and data["path"] is None
+
+def test_info_requires_input():
+    result = runner.invoke(app, ["info"])
+    assert result.exit_code == 2
+
+def test_info_rejects_unknown_fields():
+    result = runner.invoke(app, ["info", "-", "--fields", "toc,colour"], input=_pdf())
+    assert result.exit_code == 2 and "colour" in result.output
+
+def test_info_scans_directories_case_insensitively(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.pdf").write_bytes(_pdf(1))
+    (tmp_path / "sub" / "B.PDF").write_bytes(_pdf(3))
+    (tmp_path / "notes.txt").write_text("not a pdf")
+    result = runner.invoke(app, ["info", str(tmp_path), "--workers", "1"])
+    assert result.exit_code == 0
+    records = sorted((json.loads(line) for line in result.stdout.splitlines()), key=lambda r: r["pages"])
+    assert [(r["path"].rsplit("/", 1)[-1], r["pages"]) for r in records] == [("a.pdf", 1), ("B.PDF", 3)]
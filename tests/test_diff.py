@@ -0,0 +1,63 @@
+import io
+
+import pymupdf
+import pytest
+
+from pdfcraft.diff import diff_pdfs
+
+def _page(doc, label, text_extra=None, box=False):
+    page = doc.new_page(width=300, height=300)
+    page.insert_text((40, 60), f"Page {label}", fontsize=20)
+    if text_extra:
+        page.insert_text((40, 120), text_extra, fontsize=14)
+    if box:
+        page.draw_rect(pymupdf.Rect(40, 180, 200, 260), color=(1, 0, 0), fill=(1, 0, 0))
+
+def _revisions():
+    old = pymupdf.open()
+    for label in "ABCDEFGH":
+        _page(old, label)
+    # A moved to the end, C edited, D gets a drawing, E deleted, X inserted
+    new = pymupdf.open()
+    _page(new, "B")
+    _page(new, "C", text_extra="edited paragraph")
+    _page(new, "D", box=True)
+    _page(new, "F")
+    _page(new, "X")
+    _page(new, "G")
+    _page(new, "H")
+    _page(new, "A")
+    return old.tobytes(), new.tobytes()
+
+EXPECTED = [
+    {"type": "modified", "a_page": 3, "b_page": 2, "text_changed": True},
+    {"type": "modified", "a_page": 4, "b_page": 3, "text_changed": False},
+    {"type": "deleted", "a_page": 5},
+    {"type": "inserted", "b_page": 5},
+    {"type": "moved", "a_page": 1, "b_page": 8},
+]
+
+@pytest.mark.parametrize("kind", ["bytes", "path", "stream"])
+def test_diff_alignment(kind, tmp_path):
+    old, new = _revisions()
+    if kind == "path":
+        (tmp_path / "old.pdf").write_bytes(old)
+        (tmp_path / "new.pdf").write_bytes(new)
+        old, new = str(tmp_path / "old.pdf"), str(tmp_path / "new.pdf")
+    elif kind == "stream":
+        old, new = io.BytesIO(old), io.BytesIO(new)
+    report = diff_pdfs(old, new)
+    assert (report["a_pages"], report["b_pages"], report["unchanged"]) == (8, 8, 4)
+    changes = [{k: v for k, v in c.items() if k not in ("pixel_ratio", "bbox")} for c in report["changes"]]
+    assert changes == EXPECTED
+    drawn = report["changes"][1]
+    assert drawn["pixel_ratio"] > 0 and drawn["bbox"] is not None
+
+def test_diff_parallel_matches_serial():
+    old, new = _revisions()
+    assert diff_pdfs(io.BytesIO(old), new, workers=2) == diff_pdfs(old, new)
+
+def test_diff_identical():
+    old, _ = _revisions()
+    report = diff_pdfs(old, old, pixel=False)
+    assert report["changes"] == [] and report["unchanged"] == 8
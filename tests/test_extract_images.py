@@ -0,0 +1,118 @@
+import io
+import json
+
+import pikepdf
+import pymupdf
+import pytest
+from PIL import Image, ImageDraw
+
+from pdfcraft.core import _ccitt_tiff, _wrap_raw_image, extract_images
+
+def _jpeg(size=(64, 48)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+def _png(size):
+    buf = io.BytesIO()
+    Image.new("RGB", size, (0, 120, 0)).save(buf, format="PNG")
+    return buf.getvalue()
+
+def _shared_jpeg_doc():
+    "Three pages sharing one JPEG, plus a 10x10 PNG on page 2."
+    doc = pymupdf.open()
+    xref = 0
+    for pno in range(3):
+        page = doc.new_page(width=200, height=200)
+        if pno == 0:
+            xref = page.insert_image(pymupdf.Rect(10, 10, 110, 85), stream=_jpeg())
+        else:
+            page.insert_image(pymupdf.Rect(10, 10, 110, 85), xref=xref)
+    doc[1].insert_image(pymupdf.Rect(150, 150, 160, 160), stream=_png((10, 10)))
+    return doc, xref
+
+def _image_pdf(raw, **image):
+    "One page drawing a single image XObject built from a raw stream and dictionary keys."
+    pdf = pikepdf.new()
+    pdf.add_blank_page(page_size=(200, 200))
+    page = pdf.pages[0]
+    stream = pikepdf.Stream(pdf, raw)
+    stream.Type, stream.Subtype = pikepdf.Name.XObject, pikepdf.Name.Image
+    for key, value in image.items():
+        stream[f"/{key}"] = value
+    page.Resources = pikepdf.Dictionary(XObject=pikepdf.Dictionary(Im0=stream))
+    page.Contents = pdf.make_stream(b"q 100 0 0 100 0 0 cm /Im0 Do Q")
+    buf = io.BytesIO()
+    pdf.save(buf)
+    return buf.getvalue()
+
+def _image_xref(data):
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    return doc, doc[0].get_images()[0][0]
+
+def test_jpeg_passthrough_dedupes_by_xref():
+    doc, xref = _shared_jpeg_doc()
+    records = extract_images(doc.tobytes(), None)
+    jpeg = next(r for r in records if r["xref"] == xref)
+    assert len(records) == 2
+    assert jpeg["pages"] == [1, 2, 3]
+    assert jpeg["file"] == f"p0001_img{xref}.jpg" and jpeg["mode"] == "passthrough"
+    assert jpeg["data"] == doc.xref_stream_raw(xref)
+
+def test_min_size_and_index(tmp_path):
+    doc, xref = _shared_jpeg_doc()
+    assert extract_images(doc.tobytes(), str(tmp_path), min_size=20) == 1
+    index = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+    assert [(r["xref"], r["pages"], r["width"], r["height"]) for r in index] == [(xref, [1, 2, 3], 64, 48)]
+    assert (tmp_path / index[0]["file"]).read_bytes() == doc.xref_stream_raw(xref)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["index.json", index[0]["file"]])
+
+def test_no_passthrough_decodes_to_png():
+    doc, _ = _shared_jpeg_doc()
+    records = extract_images(doc.tobytes(), None, passthrough=False, workers=2)
+    assert {r["mode"] for r in records} == {"decoded"}
+    assert all(r["data"].startswith(b"\x89PNG") for r in records)
+
+@pytest.mark.parametrize("k", [-1, 0])
+def test_ccitt_stream_wrapped_as_tiff(k):
+    bilevel = Image.new("1", (96, 40), 1)
+    ImageDraw.Draw(bilevel).rectangle((10, 5, 60, 30), fill=0)
+    buf = io.BytesIO()
+    bilevel.save(buf, format="TIFF", compression="group4" if k < 0 else "group3")
+    tiff = Image.open(buf)
+    raw = buf.getvalue()[tiff.tag_v2[273][0]:][:tiff.tag_v2[279][0]]
+    data = _image_pdf(raw, Width=96, Height=40, BitsPerComponent=1, ColorSpace=pikepdf.Name.DeviceGray,
+                      Filter=pikepdf.Name.CCITTFaxDecode,
+                      DecodeParms=pikepdf.Dictionary(K=k, Columns=96, Rows=40))
+    doc, xref = _image_xref(data)
+    wrapped, ext = _wrap_raw_image(doc, xref, "CCITTFaxDecode")
+    assert ext == "tif"
+    decoded = pymupdf.Pixmap(doc, xref)
+    image = Image.open(io.BytesIO(wrapped)).convert("L")
+    assert image.size == (96, 40)
+    assert image.tobytes() == decoded.samples
+
+def test_ccitt_tiff_header():
+    tiff = _ccitt_tiff(b"\x00" * 16, 8, 2, -1, 0, False)
+    assert tiff.startswith(b"II*\x00") and tiff.endswith(b"\x00" * 16)
+    assert Image.open(io.BytesIO(tiff)).size == (8, 2)
+
+def test_jbig2_gets_file_header():
+    raw = b"\x00\x00\x00\x00\x30\x00\x01\x00\x00\x00\x13"  # arbitrary embedded segments
+    data = _image_pdf(raw, Width=8, Height=8, BitsPerComponent=1, ColorSpace=pikepdf.Name.DeviceGray,
+                      Filter=pikepdf.Name.JBIG2Decode)
+    doc, xref = _image_xref(data)
+    wrapped, ext = _wrap_raw_image(doc, xref, "JBIG2Decode")
+    assert ext == "jb2"
+    assert wrapped == b"\x97JB2\r\n\x1a\n\x01\x00\x00\x00\x01" + raw
+
+def test_jbig2_with_globals_is_not_passed_through():
+    pdf = pikepdf.open(io.BytesIO(_image_pdf(b"\x00" * 8, Width=8, Height=8, BitsPerComponent=1,
+                                             ColorSpace=pikepdf.Name.DeviceGray,
+                                             Filter=pikepdf.Name.JBIG2Decode)))
+    image = pdf.pages[0].Resources.XObject.Im0
+    image.DecodeParms = pikepdf.Dictionary(JBIG2Globals=pdf.make_stream(b"\x00" * 4))
+    buf = io.BytesIO()
+    pdf.save(buf)
+    doc, xref = _image_xref(buf.getvalue())
+    assert _wrap_raw_image(doc, xref, "JBIG2Decode") is None
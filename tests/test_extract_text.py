@@ -0,0 +1,47 @@
+import io
+import json
+
+import pymupdf
+import pytest
+
+from pdfcraft.core import extract_text
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    doc = pymupdf.open()
+    for n in range(40):
+        page = doc.new_page(width=300, height=200)
+        page.insert_text((20, 40), f"Page number {n + 1}")
+        page.insert_text((20, 80), "second line here")
+    return doc.tobytes()
+
+@pytest.mark.parametrize("fmt", ["text", "jsonl"])
+def test_parallel_matches_serial(pdf_bytes, fmt):
+    serial = extract_text(pdf_bytes, None, fmt=fmt)
+    assert extract_text(io.BytesIO(pdf_bytes), None, fmt=fmt, workers=3) == serial
+
+def test_text_pages_in_order(pdf_bytes):
+    text = extract_text(pdf_bytes, None, workers=2)
+    headers = [line for line in text.splitlines() if line.startswith("----- Page")]
+    assert headers == [f"----- Page {n} -----" for n in range(1, 41)]
+
+def test_jsonl_records(pdf_bytes, tmp_path):
+    out = tmp_path / "text.jsonl"
+    assert extract_text(pdf_bytes, str(out), fmt="jsonl", workers=2) is None
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["page"] for r in records] == list(range(1, 41))
+    first = records[0]
+    assert (first["width"], first["height"]) == (300, 200)
+    assert [w["text"] for w in first["words"]] == ["Page", "number", "1", "second", "line", "here"]
+    assert all(len(w["bbox"]) == 4 for w in first["words"])
+    assert [b["type"] for b in first["blocks"]] == ["text"] * len(first["blocks"])
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_progress_reaches_every_page(pdf_bytes, workers):
+    seen = []
+    extract_text(pdf_bytes, io.StringIO(), workers=workers, progress=lambda d, t: seen.append((d, t)))
+    assert seen[-1] == (40, 40) and [d for d, _ in seen] == sorted(d for d, _ in seen)
+
+def test_unknown_format(pdf_bytes):
+    with pytest.raises(ValueError):
+        extract_text(pdf_bytes, None, fmt="xml")
@@ -0,0 +1,62 @@
+import pymupdf
+import pytest
+
+from pdfcraft.operations import run_operation
+from pdfcraft.render import parse_size, render_pages
+
+@pytest.fixture
+def pdf_bytes():
+    doc = pymupdf.open()
+    for n in range(4):
+        doc.new_page(width=200, height=100).insert_text((20, 50), f"page {n + 1}")
+    return doc.tobytes()
+
+@pytest.mark.parametrize("spec, expected", [
+    ("144", ("dpi", 144.0, 0.0)),
+    ("72DPI", ("dpi", 72.0, 0.0)),
+    ("w320", ("w", 320.0, 0.0)),
+    ("h240", ("h", 240.0, 0.0)),
+    ("320x240", ("box", 320.0, 240.0)),
+])
+def test_parse_size(spec, expected):
+    assert parse_size(spec) == expected
+
+@pytest.mark.parametrize("spec", ["", "big", "w", "320x", "-5"])
+def test_parse_size_rejects_garbage(spec):
+    with pytest.raises(ValueError):
+        parse_size(spec)
+
+def test_sizes_per_page(pdf_bytes):
+    records = list(render_pages(pdf_bytes, pages="2", sizes=["72", "w100", "h25", "50x50"]))
+    assert [(r["page"], r["width"], r["height"]) for r in records] == [
+        (2, 200, 100), (2, 100, 50), (2, 50, 25), (2, 50, 25)]
+    assert all(r["data"].startswith(b"\x89PNG") for r in records)
+
+def test_clip_is_in_page_space(pdf_bytes):
+    (rec,) = render_pages(pdf_bytes, pages="1", sizes=["144"], clip=(0, 0, 50, 25))
+    assert (rec["width"], rec["height"]) == (100, 50)
+    # clipped to the page, so only the overlapping 20x20 pt are rendered
+    (rec,) = render_pages(pdf_bytes, pages="1", sizes=["72"], clip=(180, 80, 400, 400))
+    assert (rec["width"], rec["height"]) == (20, 20)
+    with pytest.raises(ValueError, match="does not intersect"):
+        list(render_pages(pdf_bytes, pages="1", clip=(300, 300, 400, 400)))
+
+def test_formats_and_files(pdf_bytes, tmp_path):
+    records = list(render_pages(pdf_bytes, str(tmp_path), pages="1", sizes=["w64"], fmt="jpeg", grayscale=True))
+    assert records[0]["path"].endswith("page_0001_w64.jpg")
+    assert (tmp_path / "page_0001_w64.jpg").read_bytes()[:2] == b"\xff\xd8"
+    with pytest.raises(ValueError):
+        list(render_pages(pdf_bytes, fmt="gif"))
+
+def test_parallel_matches_serial_order(pdf_bytes):
+    def strip(records):
+        return [(r["page"], r["size"], r["data"]) for r in records]
+    serial = strip(render_pages(pdf_bytes, sizes=["36", "w50"]))
+    assert strip(render_pages(pdf_bytes, sizes=["36", "w50"], workers=2)) == serial
+    assert [p for p, _, _ in serial] == [1, 1, 2, 2, 3, 3, 4, 4]
+
+def test_registered_as_operation(pdf_bytes):
+    seen = []
+    records = run_operation("render", (pdf_bytes, None), {"pages": "1-2", "sizes": ["36"]},
+                            progress=lambda done, total: seen.append((done, total)))
+    assert [r["page"] for r in records] == [1, 2] and seen == [(1, 2), (2, 2)]
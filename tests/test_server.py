@@ -0,0 +1,102 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pymupdf
+import pytest
+
+from queue import Full
+
+from pdfcraft.server import Job, JobQueue, _Handler, _request, decode, submit
+
+@pytest.fixture(scope="module")
+def jobs():
+    queue = JobQueue(2, max_queue=4)
+    yield queue
+    queue.close()
+
+@pytest.fixture(scope="module")
+def server(jobs):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), type("Handler", (_Handler,), {"jobs": jobs}))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def pdf_bytes():
+    doc = pymupdf.open()
+    for n in range(3):
+        doc.new_page().insert_text((72, 72), f"page {n + 1}")
+    return doc.tobytes()
+
+def test_structured_results_with_bytes(server, pdf_bytes):
+    job_id = submit(server, "split", [pdf_bytes, "1-2", None], wait=False)
+    status, data = _request(server, "GET", f"/jobs/{job_id}?wait=30")
+    assert data["status"] == "done"
+    status, result = _request(server, "GET", f"/jobs/{job_id}/result")
+    assert status == 200
+    assert [name for name, _ in decode(result)] == ["page_0001.pdf", "page_0002.pdf"]
+
+def test_failed_job_does_not_affect_others(server, pdf_bytes, tmp_path):
+    with pytest.raises(RuntimeError, match="failed"):
+        submit(server, "info", [str(tmp_path / "missing.pdf")])
+    assert submit(server, "info", [pdf_bytes])["pages"] == 3
+
+def test_bad_wait_is_rejected(server, pdf_bytes):
+    job_id = submit(server, "info", [pdf_bytes], wait=False)
+    status, data = _request(server, "GET", f"/jobs/{job_id}?wait=soon")
+    assert status == 400 and "wait" in data["error"]
+
+def test_close_stops_dispatching():
+    queue = JobQueue(1)
+    queue.close()
+    assert not queue._dispatcher.is_alive()
+
+@pytest.fixture
+def paused():
+    "A one-worker queue whose dispatcher is held until resume() is called."
+    queue = JobQueue(1, max_queue=3, max_result_bytes=1)
+    queue._slots = threading.Semaphore(0)
+    time.sleep(0.6)  # let a dispatch round holding the old slot time out
+    yield queue, queue._slots.release
+    queue.close()
+
+def test_priority_order(paused, pdf_bytes):
+    queue, resume = paused
+    jobs = [queue.submit(Job("info", [pdf_bytes], {}, priority=p)) for p in (0, 5, 1)]
+    resume()
+    for job in jobs:
+        assert job.done_event.wait(30)
+    started = sorted(jobs, key=lambda j: j.started)
+    assert [j.priority for j in started] == [5, 1, 0]
+
+def test_queue_bound_counts_live_jobs_only(paused, pdf_bytes):
+    queue, resume = paused
+    jobs = [queue.submit(Job("info", [pdf_bytes], {})) for _ in range(3)]
+    with pytest.raises(Full):
+        queue.submit(Job("info", [pdf_bytes], {}))
+    assert queue.cancel(jobs[0].id) and jobs[0].status == "cancelled"
+    assert not queue.cancel(jobs[0].id)
+    assert queue.metrics()["queue_depth"] == 2
+    jobs.append(queue.submit(Job("info", [pdf_bytes], {})))
+    resume()
+    for job in jobs[1:]:
+        assert job.done_event.wait(30) and job.status == "done"
+    assert jobs[0].started is None
+    assert queue.metrics()["queue_depth"] == 0
+
+def test_old_results_expire(paused, pdf_bytes):
+    queue, resume = paused
+    jobs = [queue.submit(Job("rotate", [pdf_bytes, None, "1", 90], {})) for _ in range(2)]
+    resume()
+    for job in jobs:
+        assert job.done_event.wait(30)
+    first, last = sorted(jobs, key=lambda j: j.finished)
+    assert first.result_expired and first.result is None and "result" not in first.to_dict()
+    assert not last.result_expired and last.result.startswith(b"%PDF-")
+    assert queue.metrics()["operations"]["rotate"]["counts"] == {"done": 2}
+
+def test_unknown_operation_is_rejected(jobs):
+    with pytest.raises(ValueError):
+        jobs.submit(Job("nope", [], {}))
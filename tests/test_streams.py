@@ -0,0 +1,81 @@
+import io
+import mmap
+
+import pymupdf
+import pytest
+
+from pdfcraft.core import extract_text, merge_pdfs, rotate_pages, split_pdf
+from pdfcraft.streams import open_pdf, open_text_target, save_pdf, source_stream, write_bytes
+
+def _pdf(pages=2):
+    doc = pymupdf.open()
+    for n in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {n + 1}")
+    return doc.tobytes()
+
+@pytest.fixture
+def sources(tmp_path):
+    "The same 2-page PDF as every supported kind of source."
+    data = _pdf(2)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+    f = open(path, "rb")
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    yield {"str": str(path), "pathlike": path, "bytes": data, "bytearray": bytearray(data),
+           "memoryview": memoryview(data), "mmap": mm, "stream": io.BytesIO(data)}
+    mm.close()
+    f.close()
+
+@pytest.mark.parametrize("kind", ["str", "pathlike", "bytes", "bytearray", "memoryview", "mmap", "stream"])
+def test_open_pdf_accepts_every_source(sources, kind):
+    with open_pdf(sources[kind]) as doc:
+        assert doc.page_count == 2
+
+def test_source_stream_for_file_readers(sources):
+    assert source_stream(sources["str"]) == sources["str"]
+    assert source_stream(sources["stream"]) is sources["stream"]
+    assert source_stream(sources["mmap"]).read(5) == b"%PDF-"
+
+def test_save_pdf_targets(tmp_path):
+    doc = pymupdf.open(stream=_pdf(1))
+    data = save_pdf(doc, None)
+    assert data.startswith(b"%PDF-")
+    buf = io.BytesIO()
+    assert save_pdf(doc, buf) is None and buf.getvalue().startswith(b"%PDF-")
+    assert save_pdf(doc, tmp_path / "out.pdf") is None and (tmp_path / "out.pdf").exists()
+
+def test_write_bytes_targets(tmp_path):
+    assert write_bytes(b"abc", None) == b"abc"
+    buf = io.BytesIO()
+    write_bytes(b"abc", buf)
+    write_bytes(b"abc", str(tmp_path / "x.bin"))
+    assert buf.getvalue() == (tmp_path / "x.bin").read_bytes() == b"abc"
+
+def test_open_text_target_leaves_streams_open():
+    buf = io.StringIO()
+    assert open_text_target(buf) is buf
+    assert isinstance(open_text_target(None), io.StringIO)
+
+def test_operations_return_bytes_without_output():
+    merged = merge_pdfs([_pdf(1), io.BytesIO(_pdf(2))])
+    with open_pdf(merged) as doc:
+        assert doc.page_count == 3
+    rotated = rotate_pages(merged, None, "2", 90)
+    with open_pdf(rotated) as doc:
+        assert [p.rotation for p in doc] == [0, 90, 0]
+    assert [name for name, _ in split_pdf(merged, "1,3", None)] == ["page_0001.pdf", "page_0003.pdf"]
+
+def test_operations_write_to_streams():
+    out = io.BytesIO()
+    assert merge_pdfs([_pdf(1), _pdf(1)], out) is None
+    with open_pdf(out.getvalue()) as doc:
+        assert doc.page_count == 2
+    text = io.StringIO()
+    assert extract_text(io.BytesIO(_pdf(2)), text) is None
+    assert "page 2" in text.getvalue()
+
+def test_compress_accepts_bytes_and_returns_bytes():
+    from pdfcraft.compress import compress_pdf
+    data = compress_pdf(_pdf(2), None)
+    with open_pdf(data) as doc:
+        assert doc.page_count == 2
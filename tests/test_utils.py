@@ -0,0 +1,39 @@
+import os
+
+import pymupdf
+
+from pdfcraft.streams import install_sources, open_pdf, share_sources
+from pdfcraft.utils import map_ordered, page_shards, parse_page_ranges
+
+def _square_or_crash(n):
+    if n == 3:
+        os._exit(1)  # simulate a native crash inside a worker
+    return n * n
+
+def _page_count(src):
+    with open_pdf(src) as doc:
+        return doc.page_count
+
+def test_parse_page_ranges():
+    assert parse_page_ranges("1-3,5,8-", 9) == [0, 1, 2, 4, 7, 8]
+
+def test_page_shards_are_contiguous_and_complete():
+    shards = page_shards(list(range(50)), workers=2, max_pages=16)
+    assert [p for s in shards for p in s] == list(range(50))
+    assert all(len(s) <= 16 for s in shards)
+
+def test_map_ordered_keeps_order():
+    assert list(map_ordered(abs, range(-20, 0), workers=3)) == list(range(20, 0, -1))
+
+def test_map_ordered_reports_worker_crash_per_item():
+    results = list(map_ordered(_square_or_crash, range(8), workers=2,
+                               on_crash=lambda item, e: ("crashed", item)))
+    assert results == [0, 1, 4, ("crashed", 3), 16, 25, 36, 49]
+
+def test_map_ordered_shares_sources_through_initializer():
+    doc = pymupdf.open()
+    for _ in range(3):
+        doc.new_page()
+    (src,), shared = share_sources(doc.tobytes())
+    results = map_ordered(_page_count, [src] * 4, workers=2, initializer=install_sources, initargs=(shared,))
+    assert list(results) == [3, 3, 3, 3]